@@ -0,0 +1,65 @@
+'''
+Business: Аналитика команды в текущем сезоне - форма за 5 матчей, серия, дом/выезд и личные встречи из предрасчитанных таблиц
+Args: cur - курсор открытой транзакции, old/new - строки матча до и после изменения, team_id - команда для чтения
+Returns: None при обновлении (пересчитываются только команды измененного матча), RawJSON при чтении
+'''
+from typing import Any, Dict, List, Optional
+from sqljson import RawJSON
+from standings import FINAL_STATUSES
+
+ANALYTICS_TABLES = ('teams', 'team_analytics', 'team_head_to_head')
+
+TEAM_STATS_SQL = '''
+    SELECT json_build_object(
+        'team_id', t.id,
+        'team_name', t.name,
+        'division', t.division,
+        'form', COALESCE(a.form, ''),
+        'streak', json_build_object('type', a.streak_type, 'length', COALESCE(a.streak_length, 0)),
+        'home', json_build_object(
+            'games', COALESCE(a.home_games, 0), 'wins', COALESCE(a.home_wins, 0), 'losses', COALESCE(a.home_losses, 0),
+            'goals_for', COALESCE(a.home_goals_for, 0), 'goals_against', COALESCE(a.home_goals_against, 0)
+        ),
+        'away', json_build_object(
+            'games', COALESCE(a.away_games, 0), 'wins', COALESCE(a.away_wins, 0), 'losses', COALESCE(a.away_losses, 0),
+            'goals_for', COALESCE(a.away_goals_for, 0), 'goals_against', COALESCE(a.away_goals_against, 0)
+        ),
+        'head_to_head', COALESCE((
+            SELECT json_agg(json_build_object(
+                'opponent_id', h.opponent_id, 'opponent_name', o.name, 'games', h.games, 'wins', h.wins,
+                'losses', h.losses, 'goals_for', h.goals_for, 'goals_against', h.goals_against
+            ) ORDER BY h.games DESC, h.opponent_id)
+            FROM team_head_to_head h
+            JOIN teams o ON o.id = h.opponent_id
+            WHERE h.team_id = t.id AND (%(opponent_id)s::int IS NULL OR h.opponent_id = %(opponent_id)s::int)
+        ), '[]'::json),
+        'updated_at', a.updated_at
+    )::text
+    FROM teams t
+    LEFT JOIN team_analytics a ON a.team_id = t.id
+    WHERE t.id = %(team_id)s
+'''
+
+def affected_teams(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> List[int]:
+    matches = [match for match in (old, new) if match and match.get('current_season')]
+    if not any(match.get('status') in FINAL_STATUSES for match in matches):
+        return []
+    return sorted({int(match[key]) for match in matches for key in ('home_team_id', 'away_team_id') if match.get(key) is not None})
+
+def refresh_team_analytics(cur, team_ids: List[int]) -> None:
+    if team_ids:
+        cur.execute('SELECT refresh_team_analytics(%s::int[])', (list(team_ids),))
+
+def apply_match_analytics(cur, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+    refresh_team_analytics(cur, affected_teams(old, new))
+
+def rebuild_team_analytics(cur) -> None:
+    cur.execute('SELECT refresh_team_analytics(ARRAY(SELECT id FROM teams))')
+
+def fetch_team_stats(cur, params: Dict[str, Any]) -> RawJSON:
+    team_id = params['team_id']
+    cur.execute(TEAM_STATS_SQL, {'team_id': team_id, 'opponent_id': params.get('opponent_id')})
+    row = cur.fetchone()
+    if row is None:
+        raise LookupError(f'Team {team_id} not found')
+    return RawJSON(row[0] if isinstance(row, tuple) else next(iter(row.values())))
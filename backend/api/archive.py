@@ -0,0 +1,97 @@
+'''
+Business: Создание сезонов и архивация текущего - итоговая таблица и статистика игроков замораживаются в снимках
+Args: cur - курсор открытой транзакции, body - {name, starts_on} для нового сезона или {next_season} для архивации
+Returns: данные сезона; после архивации teams, player_stats и аналитика считаются уже по новому текущему сезону
+'''
+from typing import Any, Dict, List, Optional, Tuple
+from analytics import rebuild_team_analytics
+from schema import Field, Schema, day, text
+from seasons import ALL_SEASONS
+from standings import STAT_FIELDS, rebuild_team_stats
+
+MAX_NAME_LENGTH = 20
+
+class SeasonConflict(Exception):
+    pass
+
+SEASON_COLUMNS = 'id, name, starts_on, is_current, archived_at'
+
+STANDINGS_SELECT = f'''
+    SELECT s.team_id as id, s.team_name as name, s.division, {', '.join('s.' + field for field in STAT_FIELDS)},
+           s.position, t.logo_url
+    FROM season_standings s
+    LEFT JOIN teams t ON t.id = s.team_id
+    WHERE s.season_id = %s
+'''
+
+def archived_standings_query(season_id: int, division: Optional[str]) -> Tuple[str, List[Any]]:
+    if division:
+        return STANDINGS_SELECT + ' AND s.division = %s ORDER BY s.position', [season_id, division]
+    return STANDINGS_SELECT + ' ORDER BY s.division, s.position', [season_id]
+
+_name_text = text(MAX_NAME_LENGTH)
+
+def season_name(value: Any) -> str:
+    # Название не должно совпадать с id или с season=all при чтении
+    name = _name_text(value)
+    if not name or name.isdigit() or name == ALL_SEASONS:
+        raise ValueError
+    return name
+
+SEASON_BODY = Schema(name=Field(season_name, required=True), starts_on=Field(day))
+ARCHIVE_BODY = Schema(next_season=Field(season_name, required=True))
+
+def create_season(cur, body_data: Dict[str, Any]) -> Dict[str, Any]:
+    name = body_data['name']
+    cur.execute(f'''INSERT INTO seasons (name, starts_on) VALUES (%s, %s)
+                   ON CONFLICT (name) DO NOTHING RETURNING {SEASON_COLUMNS}''',
+               (name, body_data.get('starts_on')))
+    season = cur.fetchone()
+    if season is None:
+        raise SeasonConflict(f'Season {name} already exists')
+    return dict(season)
+
+def archive_season(cur, body_data: Dict[str, Any]) -> Dict[str, Any]:
+    next_name = body_data['next_season']
+    cur.execute(f'SELECT {SEASON_COLUMNS} FROM seasons WHERE is_current FOR UPDATE')
+    current = cur.fetchone()
+    if current is None:
+        raise LookupError('No current season')
+    if current['name'] == next_name:
+        raise SeasonConflict(f'Season {next_name} is already current')
+
+    # Таблица пересобирается из матчей сезона, чтобы снимок не зависел от инкрементальных дельт
+    rebuild_team_stats(cur)
+    cur.execute(f'''
+        INSERT INTO season_standings (season_id, team_id, team_name, division, position, {', '.join(STAT_FIELDS)})
+        SELECT %s, id, name, division,
+               ROW_NUMBER() OVER (PARTITION BY division ORDER BY points DESC, goals_for - goals_against DESC, goals_for DESC, sort_order, id),
+               {', '.join(f'COALESCE({field}, 0)' for field in STAT_FIELDS)}
+        FROM teams
+    ''', (current['id'],))
+    cur.execute('''
+        INSERT INTO season_player_stats (season_id, player_id, division, nickname, jersey_number, position,
+                                         team_id, team_name, goals, assists, games_played)
+        SELECT %s, lb.player_id, lb.division, p.nickname, p.jersey_number, p.position,
+               p.team_id, t.name, lb.goals, lb.assists, lb.games_played
+        FROM player_leaderboard lb
+        JOIN players p ON p.id = lb.player_id
+        LEFT JOIN teams t ON t.id = p.team_id
+    ''', (current['id'],))
+    cur.execute(f'''UPDATE seasons SET is_current = FALSE, archived_at = CURRENT_TIMESTAMP
+                   WHERE id = %s RETURNING {SEASON_COLUMNS}''', (current['id'],))
+    archived = cur.fetchone()
+
+    cur.execute(f'''INSERT INTO seasons (name, is_current) VALUES (%s, TRUE)
+                   ON CONFLICT (name) DO UPDATE SET is_current = TRUE WHERE seasons.archived_at IS NULL
+                   RETURNING {SEASON_COLUMNS}''', (next_name,))
+    next_season = cur.fetchone()
+    if next_season is None:
+        raise SeasonConflict(f'Season {next_name} is already archived')
+
+    # Живые таблицы начинают новый сезон: матчи, заведенные заранее, сразу попадают в таблицу
+    rebuild_team_stats(cur)
+    rebuild_team_analytics(cur)
+    cur.execute('DELETE FROM player_stats')
+    cur.execute('UPDATE player_leaderboard SET goals = 0, assists = 0, games_played = 0, updated_at = CURRENT_TIMESTAMP')
+    return {'archived': dict(archived), 'current': dict(next_season)}
@@ -0,0 +1,203 @@
+'''
+Business: Хранилище изображений с адресацией по содержимому (логотипы команд и лиги)
+Args: data URI загруженного изображения, хранилище из ASSET_STORE/ASSET_DIR, адрес выдачи из ASSET_BASE_URL
+Returns: короткие URL оригинала и миниатюр вместо base64 внутри JSON; без постоянного хранилища
+         логотипы остаются встроенными, а загрузка отклоняется
+'''
+import base64
+import binascii
+import hashlib
+import io
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+# Без умолчания: /tmp у каждого экземпляра функции свой и пропадает при его пересоздании
+ASSET_DIR = os.environ.get('ASSET_DIR')
+ASSET_STORE = os.environ.get('ASSET_STORE')
+ASSET_BASE_URL = os.environ.get('ASSET_BASE_URL', 'https://functions.poehali.dev/6ba303f7-5999-4705-a914-9eea15983942')
+MAX_ASSET_BYTES = int(os.environ.get('MAX_ASSET_BYTES', str(5 * 1024 * 1024)))
+THUMBNAIL_SIZES = (64, 256)
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'gif': 'image/gif',
+    'webp': 'image/webp',
+    'svg': 'image/svg+xml'
+}
+EXTENSIONS = {content_type: ext for ext, content_type in CONTENT_TYPES.items()}
+PIL_FORMATS = {'png': 'PNG', 'jpg': 'JPEG', 'gif': 'GIF', 'webp': 'WEBP'}
+
+DATA_URI_RE = re.compile(r'^data:(image/[a-z0-9.+-]+);base64,(.*)$', re.IGNORECASE | re.DOTALL)
+KEY_RE = re.compile(r'^[0-9a-f]{64}(_\d+)?\.(png|jpg|gif|webp|svg)$')
+
+class AssetStoreNotConfigured(Exception):
+    pass
+
+class AssetStore(ABC):
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+class LocalFileStore(AssetStore):
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or ASSET_DIR
+        if not self.root:
+            raise AssetStoreNotConfigured('ASSET_DIR is not configured')
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+STORES = {'local': LocalFileStore}
+
+_store: Optional[AssetStore] = None
+
+def store_configured() -> bool:
+    # Локальный каталог годится, только если он явно задан (общий том, а не /tmp экземпляра)
+    return bool(ASSET_STORE and ASSET_STORE != 'local' or ASSET_DIR)
+
+def get_store() -> AssetStore:
+    global _store
+    if _store is None:
+        if not store_configured():
+            raise AssetStoreNotConfigured('Image storage is not configured (set ASSET_DIR or ASSET_STORE)')
+        _store = STORES[ASSET_STORE or 'local']()
+    return _store
+
+def asset_url(key: str) -> str:
+    return f'{ASSET_BASE_URL}?path=asset&key={key}'
+
+def decode_data_uri(data_uri: str) -> Tuple[bytes, str]:
+    match = DATA_URI_RE.match(data_uri or '')
+    if not match:
+        raise ValueError('Invalid image data')
+    content_type = match.group(1).lower()
+    if content_type == 'image/jpg':
+        content_type = 'image/jpeg'
+    if content_type not in EXTENSIONS:
+        raise ValueError(f'Unsupported image type {content_type}')
+    try:
+        data = base64.b64decode(match.group(2), validate=False)
+    except (binascii.Error, ValueError):
+        raise ValueError('Invalid image data')
+    if not data:
+        raise ValueError('Invalid image data')
+    if len(data) > MAX_ASSET_BYTES:
+        raise ValueError(f'Image is larger than {MAX_ASSET_BYTES} bytes')
+    return data, content_type
+
+def verify_format(data: bytes, ext: str) -> None:
+    # Заявленный в data URI тип сверяется с тем, что лежит внутри
+    if ext == 'svg':
+        head = data[:1024].lstrip().lower()
+        if not (head.startswith(b'<svg') or head.startswith(b'<?xml') and b'<svg' in data[:4096].lower()):
+            raise ValueError('Image data is not image/svg+xml')
+        return
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            actual = image.format
+    except (UnidentifiedImageError, OSError):
+        raise ValueError('Invalid image data')
+    if actual != PIL_FORMATS[ext]:
+        raise ValueError(f'Image data is not {CONTENT_TYPES[ext]}')
+
+def _thumbnail(data: bytes, ext: str, size: int) -> bytes:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail((size, size))
+        if ext == 'jpg' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        out = io.BytesIO()
+        image.save(out, format=PIL_FORMATS[ext])
+        return out.getvalue()
+
+def plan_image(data_uri: str, store: AssetStore) -> Tuple[Dict[str, object], List[Tuple[str, bytes]]]:
+    # Ответ загрузки и еще не записанные в хранилище файлы (оригинал и миниатюры), без записи
+    data, content_type = decode_data_uri(data_uri)
+    ext = EXTENSIONS[content_type]
+    verify_format(data, ext)
+    digest = hashlib.sha256(data).hexdigest()
+    key = f'{digest}.{ext}'
+
+    thumbnails: Dict[str, str] = {}
+    pending = [] if store.exists(key) else [(key, data)]
+    if ext != 'svg':
+        for size in THUMBNAIL_SIZES:
+            thumb_key = f'{digest}_{size}.{ext}'
+            if not store.exists(thumb_key):
+                try:
+                    pending.append((thumb_key, _thumbnail(data, ext, size)))
+                except OSError:
+                    raise ValueError('Invalid image data')
+            thumbnails[str(size)] = asset_url(thumb_key)
+
+    asset = {'key': key, 'url': asset_url(key), 'content_type': content_type, 'size': len(data), 'thumbnails': thumbnails}
+    return asset, pending
+
+def store_image(data_uri: str, store: Optional[AssetStore] = None) -> Dict[str, object]:
+    store = store or get_store()
+    asset, pending = plan_image(data_uri, store)
+    for pending_key, payload in pending:
+        store.put(pending_key, payload, str(asset['content_type']))
+    return asset
+
+def externalize(value: Optional[str]) -> Optional[str]:
+    # Без постоянного хранилища встроенный логотип остается в БД как есть
+    if value and value.startswith('data:image') and store_configured():
+        return store_image(value)['url']
+    return value
+
+def asset_response(key: str) -> Dict[str, object]:
+    data = get_store().get(key) if key and KEY_RE.match(key) and store_configured() else None
+    if data is None:
+        return {
+            'statusCode': 404,
+            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+            'isBase64Encoded': False,
+            'body': '{"error": "Asset not found"}'
+        }
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': CONTENT_TYPES[key.rsplit('.', 1)[1]],
+            'Access-Control-Allow-Origin': '*',
+            'Cache-Control': ASSET_CACHE_CONTROL,
+            'Content-Security-Policy': "default-src 'none'",
+            'X-Content-Type-Options': 'nosniff',
+            'ETag': '"' + key.split('.', 1)[0] + '"'
+        },
+        'isBase64Encoded': True,
+        'body': base64.b64encode(data).decode('ascii')
+    }
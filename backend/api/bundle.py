@@ -0,0 +1,76 @@
+'''
+Business: Единый "бандл" главной страницы - лига, текущий сезон, команды, матчи сезона, чемпионы, регламент и бомбардиры
+Args: cur - курсор БД, params - matches_limit и players_limit (необязательные)
+Returns: RawJSON с документом, собранным одним запросом в Postgres
+'''
+from typing import Any, Dict
+from seasons import CURRENT_SEASON_SQL
+from sqljson import RawJSON, fetch_json
+
+DEFAULT_PLAYERS_LIMIT = 10
+MAX_LIMIT = 500
+
+BUNDLE_TABLES = ('league_info', 'social_links', 'seasons', 'teams', 'matches', 'regulations', 'champions', 'players', 'player_leaderboard')
+
+BUNDLE_SQL = f'''
+    SELECT json_build_object(
+        'league_info', COALESCE(
+            (SELECT to_jsonb(li) FROM league_info li ORDER BY id DESC LIMIT 1),
+            jsonb_build_object('league_name', 'PHL', 'description', '', 'logo_url', NULL)
+        ) || jsonb_build_object('social_links', COALESCE(
+            (SELECT jsonb_agg(sl ORDER BY sl.sort_order) FROM social_links sl), '[]'::jsonb
+        )),
+        'season', (SELECT row_to_json(s) FROM seasons s WHERE s.is_current),
+        'teams', COALESCE(
+            (SELECT json_agg(t ORDER BY t.division, t.sort_order, t.id) FROM teams t), '[]'::json
+        ),
+        'matches', COALESCE(
+            (SELECT json_agg(m ORDER BY m.match_date DESC, m.id DESC) FROM (
+                SELECT m.*, ht.name as home_team_name, at.name as away_team_name
+                FROM matches m
+                LEFT JOIN teams ht ON m.home_team_id = ht.id
+                LEFT JOIN teams at ON m.away_team_id = at.id
+                WHERE m.season_id = {CURRENT_SEASON_SQL}
+                ORDER BY m.match_date DESC, m.id DESC
+                LIMIT %(matches_limit)s
+            ) m), '[]'::json
+        ),
+        'champions', COALESCE(
+            (SELECT json_agg(c ORDER BY c.season DESC) FROM champions c), '[]'::json
+        ),
+        'regulations', COALESCE(
+            (SELECT row_to_json(r) FROM regulations r ORDER BY id DESC LIMIT 1),
+            json_build_object('content', 'Регламент скоро появится')
+        ),
+        'players', COALESCE(
+            (SELECT json_agg(lb ORDER BY lb.rank, lb.id) FROM (
+                SELECT p.id, p.nickname, p.jersey_number, p.position,
+                       t.name as team_name, t.logo_url as team_logo,
+                       top.goals, top.assists, top.games_played, top.points, top.rank
+                FROM (
+                    SELECT player_id, goals, assists, games_played, points,
+                           RANK() OVER (ORDER BY goals DESC, assists DESC) as rank
+                    FROM player_leaderboard
+                    WHERE division = 'ALL'
+                    ORDER BY goals DESC, assists DESC, player_id
+                    LIMIT %(players_limit)s
+                ) top
+                JOIN players p ON p.id = top.player_id
+                JOIN teams t ON p.team_id = t.id
+            ) lb), '[]'::json
+        ),
+        'live_version', (SELECT COALESCE(MAX(version), 0) FROM match_events)
+    )::text
+'''
+
+def _limit(params: Dict[str, Any], name: str, default: Any) -> Any:
+    value = params.get(name)
+    if value is None:
+        return default
+    return max(0, min(value, MAX_LIMIT))
+
+def fetch_bundle(cur, params: Dict[str, Any]) -> RawJSON:
+    return fetch_json(cur, BUNDLE_SQL, {
+        'matches_limit': _limit(params, 'matches_limit', None),
+        'players_limit': _limit(params, 'players_limit', DEFAULT_PLAYERS_LIMIT)
+    })
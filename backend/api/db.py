@@ -0,0 +1,180 @@
+'''
+Business: Пул соединений с Postgres, переживающий теплые вызовы функции
+Args: dsn - строка подключения (по умолчанию DATABASE_URL, для readonly - DATABASE_READ_URL), размер пула из DB_POOL_MIN/DB_POOL_MAX,
+      DB_WARMUP=1 - открыть пул в фоне при импорте функции, DB_POOL_WAIT_SECONDS - сколько ждать свободное соединение
+Размер пула: DB_POOL_MAX на инстанс - не меньше одновременных запросов инстанса (каждый держит одно соединение,
+      long-poll live - только на дочитывание), а DB_POOL_MAX x число инстансов плюс по одному LISTEN на инстанс
+      должно оставаться ниже max_connections Postgres; при занятом пуле запрос ждет, затем получает 503 с Retry-After
+Returns: контекстный менеджер connection() с проверенным живым соединением; после записи - токен read-after,
+         пока реплика его не догнала, чтение идет на основную базу
+'''
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+from instrument import phase, traced_cursor_factory
+
+POOL_MIN = int(os.environ.get('DB_POOL_MIN', '1'))
+POOL_MAX = int(os.environ.get('DB_POOL_MAX', '5'))
+PING_AFTER_SECONDS = float(os.environ.get('DB_POOL_PING_SECONDS', '30'))
+RECYCLE_SECONDS = float(os.environ.get('DB_POOL_RECYCLE_SECONDS', '1800'))
+POOL_WAIT_SECONDS = float(os.environ.get('DB_POOL_WAIT_SECONDS', '2'))
+READ_AFTER_SECONDS = float(os.environ.get('READ_AFTER_SECONDS', '30'))
+DB_WARMUP = os.environ.get('DB_WARMUP', '0') == '1'
+
+class PoolExhausted(PoolError):
+    pass
+
+class PooledConnection(psycopg2.extensions.connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def cursor(self, *args, **kwargs):
+        base = kwargs.get('cursor_factory') or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs['cursor_factory'] = traced_cursor_factory(base)
+        return super().cursor(*args, **kwargs)
+
+_pools: Dict[Tuple[str, bool], ThreadedConnectionPool] = {}
+_pools_lock = threading.Lock()
+_released = threading.Condition()
+
+def resolve_dsn(readonly: bool = False) -> Tuple[str, bool]:
+    read_dsn = os.environ.get('DATABASE_READ_URL')
+    if readonly and read_dsn:
+        return read_dsn, True
+    return os.environ.get('DATABASE_URL'), False
+
+def get_pool(dsn: Optional[str] = None, readonly: bool = False) -> ThreadedConnectionPool:
+    if dsn is None:
+        dsn, readonly = resolve_dsn(readonly)
+    key = (dsn, readonly)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = {'options': '-c default_transaction_read_only=on'} if readonly else {}
+                pool = ThreadedConnectionPool(POOL_MIN, max(POOL_MIN, POOL_MAX), dsn,
+                                              connection_factory=PooledConnection, **options)
+                _pools[key] = pool
+    return pool
+
+def warm_up(readonly_modes: Iterable[bool] = (False,)) -> threading.Thread:
+    # Пул создается под _pools_lock: первый запрос дождется фонового подключения, а не откроет второе
+    keys = {resolve_dsn(readonly) for readonly in readonly_modes}
+
+    def open_pools() -> None:
+        for dsn, readonly in keys:
+            try:
+                get_pool(dsn, readonly)
+            except psycopg2.Error:
+                pass  # первый запрос повторит подключение и вернет ошибку
+
+    thread = threading.Thread(target=open_pools, name='db-warmup', daemon=True)
+    thread.start()
+    return thread
+
+def _is_healthy(conn: PooledConnection) -> bool:
+    if conn.closed:
+        return False
+    now = time.monotonic()
+    if now - conn.created_at > RECYCLE_SECONDS:
+        return False
+    if now - conn.last_used > PING_AFTER_SECONDS:
+        try:
+            # Курсор без трассировки: служебный ping не попадает в журнал запросов и фазу db
+            with psycopg2.extensions.cursor(conn) as cur:
+                cur.execute('SELECT 1')
+            conn.rollback()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+    return True
+
+def _getconn(pool: ThreadedConnectionPool) -> PooledConnection:
+    # getconn не ждет: при DB_POOL_MAX занятых соединений сразу PoolError - ждем возврата соединения не дольше POOL_WAIT_SECONDS
+    deadline = time.monotonic() + POOL_WAIT_SECONDS
+    while True:
+        try:
+            return pool.getconn()
+        except PoolError:
+            remaining = deadline - time.monotonic()
+            if pool.closed or remaining <= 0:
+                raise PoolExhausted(f'All {pool.maxconn} database connections are busy')
+            with _released:
+                _released.wait(min(remaining, 0.05))
+
+def _checkout(pool: ThreadedConnectionPool) -> PooledConnection:
+    for _ in range(max(1, pool.maxconn) + 1):
+        conn = _getconn(pool)
+        if _is_healthy(conn):
+            return conn
+        pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError('No healthy database connection available')
+
+def _release(pool: ThreadedConnectionPool, conn: PooledConnection) -> None:
+    broken = bool(conn.closed)
+    if not broken and conn.status != psycopg2.extensions.STATUS_READY:
+        try:
+            conn.rollback()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+    conn.last_used = time.monotonic()
+    pool.putconn(conn, close=broken)
+    with _released:
+        _released.notify()
+
+def write_token(conn: PooledConnection) -> Optional[str]:
+    if not os.environ.get('DATABASE_READ_URL'):
+        return None
+    with conn.cursor() as cur:
+        cur.execute('SELECT pg_current_wal_lsn()::text')
+        lsn = cur.fetchone()[0]
+    return f'{lsn}@{int(time.time() + READ_AFTER_SECONDS)}'
+
+def parse_token(token: Optional[str]) -> Optional[str]:
+    lsn, _, expires = (token or '').partition('@')
+    try:
+        expires_at = int(expires)
+    except ValueError:
+        return None
+    if not lsn or not time.time() < expires_at <= time.time() + READ_AFTER_SECONDS:
+        return None
+    return lsn
+
+def _replica_caught_up(conn: PooledConnection, lsn: str) -> bool:
+    try:
+        with conn.cursor() as cur:
+            cur.execute('SELECT COALESCE(pg_last_wal_replay_lsn() >= %s::pg_lsn, false)', (lsn,))
+            caught_up = cur.fetchone()[0]
+        conn.rollback()
+        return caught_up
+    except psycopg2.DataError:
+        conn.rollback()
+        return False
+
+@contextmanager
+def connection(dsn: Optional[str] = None, readonly: bool = False, read_after: Optional[str] = None) -> Iterator[PooledConnection]:
+    with phase('connect'):
+        pool = get_pool(dsn, readonly)
+        conn = _checkout(pool)
+        lsn = parse_token(read_after) if dsn is None and readonly else None
+        if lsn and os.environ.get('DATABASE_READ_URL') and not _replica_caught_up(conn, lsn):
+            _release(pool, conn)
+            pool = get_pool(os.environ.get('DATABASE_URL'), False)
+            conn = _checkout(pool)
+    try:
+        yield conn
+    finally:
+        _release(pool, conn)
+
+def close_all() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
@@ -3,277 +3,307 @@ Business: API для хоккейного сайта - получение и у
 Args: event - dict с httpMethod, body, queryStringParameters
 Returns: HTTP response dict с данными или ошибкой
 '''
-import json
-import os
-import base64
 from typing import Dict, Any
-import psycopg2
 from psycopg2.extras import RealDictCursor
+from analytics import ANALYTICS_TABLES, apply_match_analytics, fetch_team_stats, rebuild_team_analytics
+from archive import ARCHIVE_BODY, SEASON_BODY, SeasonConflict, archive_season, archived_standings_query, create_season
+from assets import AssetStoreNotConfigured, asset_response, externalize, store_image
+from bundle import BUNDLE_TABLES, fetch_bundle
+from cache import response_cache
+from fastjson import dumps, fast_mode
+from instrument import traced
+from live import poll_events
+from matches import list_matches
+from reorder import apply_order, lock_division, lock_divisions
+from runtime import NO_DB, READ_ONLY, HttpError, HttpResponse, Request, Router, json_response
+from schemas import (CHAMPION_BODY, HOMEPAGE_QUERY, ID_QUERY, IMAGE_BODY, LEAGUE_INFO_BODY, LIVE_QUERY, MATCH_BODY,
+                     MATCHES_QUERY, MATCH_UPDATE_BODY, REGULATIONS_BODY, SOCIAL_LINK_BODY, TEAM_BODY, TEAM_STATS_QUERY,
+                     TEAM_UPDATE_BODY, TEAMS_QUERY)
+from seasons import CURRENT_SEASON_SQL, archived_season
+from sqljson import fetch_json_array
+from standings import MATCH_COLUMNS, apply_match_change, rebuild_team_stats
 
-def get_db_connection():
-    database_url = os.environ.get('DATABASE_URL')
-    return psycopg2.connect(database_url, cursor_factory=RealDictCursor)
+# Запросы записи матчей собираются один раз при импорте, а не в каждом вызове
+INSERT_MATCH_SQL = f'''INSERT INTO matches (season_id, match_date, home_team_id, away_team_id,
+                      home_score, away_score, status)
+                      VALUES (COALESCE(%s, {CURRENT_SEASON_SQL}), %s, %s, %s, %s, %s, %s) RETURNING {MATCH_COLUMNS}'''
+LOCK_MATCH_SQL = f'SELECT {MATCH_COLUMNS} FROM matches WHERE id = %s FOR UPDATE'
+UPDATE_MATCH_SQL = f'''UPDATE matches SET season_id = COALESCE(%s, season_id), match_date = %s, home_team_id = %s,
+                      away_team_id = %s, home_score = %s, away_score = %s, status = %s
+                      WHERE season_id = %s AND id = %s RETURNING {MATCH_COLUMNS}'''
+DELETE_MATCH_SQL = f'DELETE FROM matches WHERE id = %s RETURNING {MATCH_COLUMNS}'
 
-def recalculate_team_stats(cur, conn):
-    cur.execute('SELECT id FROM teams')
-    teams = cur.fetchall()
-    
-    for team in teams:
-        team_id = team['id']
-        
-        cur.execute('''
-            SELECT 
-                COUNT(*) as games,
-                SUM(CASE 
-                    WHEN (home_team_id = %s AND home_score > away_score AND status = 'Конец матча') OR
-                         (away_team_id = %s AND away_score > home_score AND status = 'Конец матча')
-                    THEN 1 ELSE 0 END) as wins,
-                SUM(CASE 
-                    WHEN (home_team_id = %s AND home_score > away_score AND status IN ('Конец матча (ОТ)', 'Конец матча (Б)')) OR
-                         (away_team_id = %s AND away_score > home_score AND status IN ('Конец матча (ОТ)', 'Конец матча (Б)'))
-                    THEN 1 ELSE 0 END) as wins_ot,
-                SUM(CASE 
-                    WHEN (home_team_id = %s AND home_score < away_score AND status IN ('Конец матча (ОТ)', 'Конец матча (Б)')) OR
-                         (away_team_id = %s AND away_score < home_score AND status IN ('Конец матча (ОТ)', 'Конец матча (Б)'))
-                    THEN 1 ELSE 0 END) as losses_ot,
-                SUM(CASE 
-                    WHEN (home_team_id = %s AND home_score < away_score AND status = 'Конец матча') OR
-                         (away_team_id = %s AND away_score < home_score AND status = 'Конец матча')
-                    THEN 1 ELSE 0 END) as losses,
-                SUM(CASE WHEN home_team_id = %s THEN home_score WHEN away_team_id = %s THEN away_score ELSE 0 END) as goals_for,
-                SUM(CASE WHEN home_team_id = %s THEN away_score WHEN away_team_id = %s THEN home_score ELSE 0 END) as goals_against
-            FROM matches
-            WHERE (home_team_id = %s OR away_team_id = %s) AND status IN ('Конец матча', 'Конец матча (ОТ)', 'Конец матча (Б)')
-        ''', (team_id, team_id, team_id, team_id, team_id, team_id, team_id, team_id, 
-              team_id, team_id, team_id, team_id, team_id, team_id))
-        
-        stats = cur.fetchone()
-        games = stats['games'] or 0
-        wins = stats['wins'] or 0
-        wins_ot = stats['wins_ot'] or 0
-        losses_ot = stats['losses_ot'] or 0
-        losses = stats['losses'] or 0
-        goals_for = stats['goals_for'] or 0
-        goals_against = stats['goals_against'] or 0
-        
-        points = wins * 2 + wins_ot * 2 + losses_ot * 1
-        
-        cur.execute('''
-            UPDATE teams SET 
-                games_played = %s, wins = %s, wins_ot = %s, losses_ot = %s, 
-                losses = %s, goals_for = %s, goals_against = %s, points = %s
-            WHERE id = %s
-        ''', (games, wins, wins_ot, losses_ot, losses, goals_for, goals_against, points, team_id))
-    
+router = Router('api', 'Content-Type, X-Auth-Token, If-None-Match, If-Modified-Since')
+
+@router.route('GET', 'cache-stats', db=NO_DB)
+def get_cache_stats(req: Request) -> Dict[str, Any]:
+    return {**response_cache.stats(), 'rejections': dict(router.rejections)}
+
+@router.route('GET', 'asset', db=NO_DB)
+def get_asset(req: Request) -> HttpResponse:
+    return HttpResponse(asset_response(req.params.get('key', '')))
+
+# Исключение из объявления db: long-poll не держит соединение пула на время ожидания;
+# LISTEN и редкое дочитывание из таблицы live.py открывает сам (см. live.py)
+@router.route('GET', 'live', db=NO_DB, query=LIVE_QUERY)
+def get_live(req: Request) -> HttpResponse:
+    return json_response(dumps(poll_events(req.query.get('since'), req.query['timeout']), fast_mode(req.params)),
+                         headers={'Cache-Control': 'no-store'})
+
+@router.route('GET', 'league-info', db=READ_ONLY, resources=('league_info', 'social_links'))
+def get_league_info(req: Request, conn) -> Dict[str, Any]:
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute('SELECT * FROM league_info ORDER BY id DESC LIMIT 1')
+    data = cur.fetchone()
+    cur.execute('SELECT * FROM social_links ORDER BY sort_order')
+    social_links = cur.fetchall()
+    result = dict(data) if data else {'league_name': 'PHL', 'description': '', 'logo_url': None}
+    result['social_links'] = [dict(row) for row in social_links]
+    return result
+
+@router.route('GET', 'teams', db=READ_ONLY, resources=('teams', 'seasons', 'season_standings'), query=TEAMS_QUERY)
+def get_teams(req: Request, conn) -> Any:
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    division = req.query.get('division')
+    try:
+        season_id = archived_season(cur, req.query)
+    except LookupError as e:
+        raise HttpError(404, str(e))
+    if season_id is not None:
+        query, args = archived_standings_query(season_id, division)
+    elif division:
+        # Ручной порядок из teams-reorder (sort_order) - его видит и меняет админка
+        query, args = 'SELECT * FROM teams WHERE division = %s ORDER BY sort_order, id', (division,)
+    else:
+        query, args = 'SELECT * FROM teams ORDER BY division, sort_order, id', ()
+    if fast_mode(req.params) == 'sql':
+        return fetch_json_array(cur, query, args)
+    cur.execute(query, args)
+    return [dict(row) for row in cur.fetchall()]
+
+@router.route('GET', 'matches', db=READ_ONLY, resources=('matches', 'teams', 'seasons'), query=MATCHES_QUERY)
+def get_matches(req: Request, conn) -> Any:
+    return list_matches(conn.cursor(cursor_factory=RealDictCursor), req.query, fast_mode(req.params))
+
+@router.route('GET', 'regulations', db=READ_ONLY, resources=('regulations',))
+def get_regulations(req: Request, conn) -> Dict[str, Any]:
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute('SELECT * FROM regulations ORDER BY id DESC LIMIT 1')
+    data = cur.fetchone()
+    return dict(data) if data else {'content': 'Регламент скоро появится'}
+
+@router.route('GET', 'champions', db=READ_ONLY, resources=('champions',))
+def get_champions(req: Request, conn) -> Any:
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    if fast_mode(req.params) == 'sql':
+        return fetch_json_array(cur, 'SELECT * FROM champions ORDER BY season DESC')
+    cur.execute('SELECT * FROM champions ORDER BY season DESC')
+    return [dict(row) for row in cur.fetchall()]
+
+@router.route('GET', 'seasons', db=READ_ONLY, resources=('seasons',))
+def get_seasons(req: Request, conn) -> Any:
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute('SELECT * FROM seasons ORDER BY is_current DESC, COALESCE(starts_on, created_at::date) DESC, id DESC')
+    return [dict(row) for row in cur.fetchall()]
+
+@router.route('GET', 'team-stats', db=READ_ONLY, resources=ANALYTICS_TABLES, query=TEAM_STATS_QUERY)
+def get_team_stats(req: Request, conn) -> Any:
+    try:
+        return fetch_team_stats(conn.cursor(), req.query)
+    except LookupError as e:
+        raise HttpError(404, str(e))
+
+@router.route('GET', 'homepage', db=READ_ONLY, resources=BUNDLE_TABLES, query=HOMEPAGE_QUERY)
+def get_homepage(req: Request, conn) -> Any:
+    return fetch_bundle(conn.cursor(cursor_factory=RealDictCursor), req.query)
+
+@router.route('POST', 'league-info', invalidates=('league-info', 'homepage'), body=LEAGUE_INFO_BODY)
+def update_league_info(req: Request, conn) -> Dict[str, Any]:
+    body_data = req.data
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute('UPDATE league_info SET league_name = %s, description = %s, logo_url = %s, updated_at = CURRENT_TIMESTAMP WHERE id = 1',
+               (body_data.get('league_name'), body_data.get('description'), externalize(body_data.get('logo_url'))))
     conn.commit()
+    return {'success': True}
 
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    method: str = event.get('httpMethod', 'GET')
-    path: str = event.get('queryStringParameters', {}).get('path', '')
-    
-    if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-Auth-Token',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': ''
-        }
-    
+@router.route('POST', 'upload-image', db=NO_DB, body=IMAGE_BODY)
+def upload_image(req: Request) -> Dict[str, Any]:
+    try:
+        return {'success': True, **store_image(req.data['image'])}
+    except AssetStoreNotConfigured as e:
+        raise HttpError(503, str(e))
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}
+
+@router.route('POST', 'social-links', invalidates=('league-info', 'homepage'), body=SOCIAL_LINK_BODY)
+def create_social_link(req: Request, conn) -> Dict[str, Any]:
+    body_data = req.data
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute('INSERT INTO social_links (platform, url, icon, sort_order) VALUES (%s, %s, %s, %s)',
+               (body_data.get('platform'), body_data.get('url'), body_data.get('icon', 'Link'), body_data.get('sort_order', 0)))
+    conn.commit()
+    return {'success': True}
+
+@router.route('POST', 'teams', invalidates=('teams', 'matches', 'team-stats', 'homepage'), body=TEAM_BODY)
+def create_team(req: Request, conn) -> Dict[str, Any]:
+    body_data = req.data
+    cur = conn.cursor()
+    # Новая команда - последней в дивизионе; дивизион заблокирован, две вставки не получат одну позицию
+    _, order = lock_division(cur, body_data.get('division'))
+    cur.execute('''INSERT INTO teams (name, division, games_played, wins, wins_ot, losses_ot,
+                   losses, goals_for, goals_against, points, sort_order)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id''',
+               (body_data.get('name'), body_data.get('division'),
+                body_data.get('games_played', 0), body_data.get('wins', 0),
+                body_data.get('wins_ot', 0), body_data.get('losses_ot', 0),
+                body_data.get('losses', 0), body_data.get('goals_for', 0),
+                body_data.get('goals_against', 0), body_data.get('points', 0),
+                len(order)))
+    apply_order(cur, order + [cur.fetchone()[0]])
+    conn.commit()
+    return {'success': True}
+
+@router.route('POST', 'matches', invalidates=('matches', 'teams', 'team-stats', 'homepage'), body=MATCH_BODY)
+def create_match(req: Request, conn) -> Dict[str, Any]:
+    body_data = req.data
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute(INSERT_MATCH_SQL,
+               (body_data.get('season_id'), body_data.get('match_date'), body_data.get('home_team_id'),
+                body_data.get('away_team_id'), body_data.get('home_score', 0),
+                body_data.get('away_score', 0), body_data.get('status', 'Не начался')))
+    new_match = cur.fetchone()
+    apply_match_change(cur, None, new_match)
+    apply_match_analytics(cur, None, new_match)
+    conn.commit()
+    return {'success': True}
+
+@router.route('POST', 'standings-rebuild', invalidates=('teams', 'team-stats', 'homepage'))
+def rebuild_standings(req: Request, conn) -> Dict[str, Any]:
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    rebuild_team_stats(cur)
+    rebuild_team_analytics(cur)
+    conn.commit()
+    return {'success': True}
+
+@router.route('POST', 'seasons', invalidates=('seasons',), body=SEASON_BODY)
+def create_season_route(req: Request, conn) -> Dict[str, Any]:
+    try:
+        season = create_season(conn.cursor(cursor_factory=RealDictCursor), req.data)
+    except SeasonConflict as e:
+        raise HttpError(409, str(e))
+    conn.commit()
+    return {'success': True, 'season': season}
+
+@router.route('POST', 'seasons-archive', invalidates=('seasons', 'teams', 'matches', 'team-stats', 'homepage'), body=ARCHIVE_BODY)
+def archive_current_season(req: Request, conn) -> Dict[str, Any]:
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        if method == 'GET':
-            if path == 'league-info':
-                cur.execute('SELECT * FROM league_info ORDER BY id DESC LIMIT 1')
-                data = cur.fetchone()
-                cur.execute('SELECT * FROM social_links ORDER BY sort_order')
-                social_links = cur.fetchall()
-                result = dict(data) if data else {'league_name': 'PHL', 'description': '', 'logo_url': None}
-                result['social_links'] = [dict(row) for row in social_links]
-                
-            elif path == 'teams':
-                division = event.get('queryStringParameters', {}).get('division')
-                if division:
-                    cur.execute('SELECT * FROM teams WHERE division = %s ORDER BY points DESC, goals_for - goals_against DESC', (division,))
-                else:
-                    cur.execute('SELECT * FROM teams ORDER BY division, points DESC')
-                result = [dict(row) for row in cur.fetchall()]
-                
-            elif path == 'matches':
-                cur.execute('''
-                    SELECT m.*, 
-                           ht.name as home_team_name, 
-                           at.name as away_team_name
-                    FROM matches m
-                    LEFT JOIN teams ht ON m.home_team_id = ht.id
-                    LEFT JOIN teams at ON m.away_team_id = at.id
-                    ORDER BY m.match_date DESC
-                ''')
-                result = [dict(row) for row in cur.fetchall()]
-                
-            elif path == 'regulations':
-                cur.execute('SELECT * FROM regulations ORDER BY id DESC LIMIT 1')
-                data = cur.fetchone()
-                result = dict(data) if data else {'content': 'Регламент скоро появится'}
-                
-            elif path == 'champions':
-                cur.execute('SELECT * FROM champions ORDER BY season DESC')
-                result = [dict(row) for row in cur.fetchall()]
-                
-            else:
-                result = {'error': 'Unknown path'}
-                
-        elif method == 'POST':
-            body_data = json.loads(event.get('body', '{}'))
-            
-            if path == 'league-info':
-                cur.execute('UPDATE league_info SET league_name = %s, description = %s, logo_url = %s, updated_at = CURRENT_TIMESTAMP WHERE id = 1',
-                           (body_data.get('league_name'), body_data.get('description'), body_data.get('logo_url')))
-                conn.commit()
-                result = {'success': True}
-                
-            elif path == 'upload-image':
-                image_data = body_data.get('image')
-                if image_data and image_data.startswith('data:image'):
-                    result = {'success': True, 'url': image_data}
-                else:
-                    result = {'success': False, 'error': 'Invalid image data'}
-                
-            elif path == 'social-links':
-                cur.execute('INSERT INTO social_links (platform, url, icon, sort_order) VALUES (%s, %s, %s, %s)',
-                           (body_data.get('platform'), body_data.get('url'), body_data.get('icon', 'Link'), body_data.get('sort_order', 0)))
-                conn.commit()
-                result = {'success': True}
-                
-            elif path == 'teams':
-                cur.execute('''INSERT INTO teams (name, division, games_played, wins, wins_ot, losses_ot, 
-                               losses, goals_for, goals_against, points) 
-                               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)''',
-                           (body_data.get('name'), body_data.get('division'), 
-                            body_data.get('games_played', 0), body_data.get('wins', 0),
-                            body_data.get('wins_ot', 0), body_data.get('losses_ot', 0),
-                            body_data.get('losses', 0), body_data.get('goals_for', 0),
-                            body_data.get('goals_against', 0), body_data.get('points', 0)))
-                conn.commit()
-                result = {'success': True}
-                
-            elif path == 'matches':
-                cur.execute('''INSERT INTO matches (match_date, home_team_id, away_team_id, 
-                               home_score, away_score, status) 
-                               VALUES (%s, %s, %s, %s, %s, %s)''',
-                           (body_data.get('match_date'), body_data.get('home_team_id'),
-                            body_data.get('away_team_id'), body_data.get('home_score', 0),
-                            body_data.get('away_score', 0), body_data.get('status', 'Не начался')))
-                conn.commit()
-                
-                if body_data.get('status') in ['Конец матча', 'Конец матча (ОТ)', 'Конец матча (Б)']:
-                    recalculate_team_stats(cur, conn)
-                
-                result = {'success': True}
-                
-            elif path == 'regulations':
-                cur.execute('UPDATE regulations SET content = %s, updated_at = CURRENT_TIMESTAMP WHERE id = 1',
-                           (body_data.get('content'),))
-                conn.commit()
-                result = {'success': True}
-                
-            elif path == 'champions':
-                cur.execute('INSERT INTO champions (season, team_id, team_name, description) VALUES (%s, %s, %s, %s)',
-                           (body_data.get('season'), body_data.get('team_id'), 
-                            body_data.get('team_name'), body_data.get('description')))
-                conn.commit()
-                result = {'success': True}
-                
-            else:
-                result = {'error': 'Unknown path'}
-                
-        elif method == 'PUT':
-            body_data = json.loads(event.get('body', '{}'))
-            item_id = body_data.get('id')
-            
-            if path == 'teams':
-                cur.execute('''UPDATE teams SET name = %s, division = %s, games_played = %s, 
-                               wins = %s, wins_ot = %s, losses_ot = %s, losses = %s, 
-                               goals_for = %s, goals_against = %s, points = %s, logo_url = %s WHERE id = %s''',
-                           (body_data.get('name'), body_data.get('division'),
-                            body_data.get('games_played'), body_data.get('wins'),
-                            body_data.get('wins_ot'), body_data.get('losses_ot'),
-                            body_data.get('losses'), body_data.get('goals_for'),
-                            body_data.get('goals_against'), body_data.get('points'), 
-                            body_data.get('logo_url'), item_id))
-                conn.commit()
-                result = {'success': True}
-                
-            elif path == 'matches':
-                cur.execute('''UPDATE matches SET match_date = %s, home_team_id = %s, 
-                               away_team_id = %s, home_score = %s, away_score = %s, status = %s 
-                               WHERE id = %s''',
-                           (body_data.get('match_date'), body_data.get('home_team_id'),
-                            body_data.get('away_team_id'), body_data.get('home_score'),
-                            body_data.get('away_score'), body_data.get('status'), item_id))
-                conn.commit()
-                
-                if body_data.get('status') in ['Конец матча', 'Конец матча (ОТ)', 'Конец матча (Б)']:
-                    recalculate_team_stats(cur, conn)
-                
-                result = {'success': True}
-                
-            else:
-                result = {'error': 'Unknown path'}
-                
-        elif method == 'DELETE':
-            item_id = event.get('queryStringParameters', {}).get('id')
-            
-            if path == 'teams':
-                cur.execute('DELETE FROM teams WHERE id = %s', (item_id,))
-                conn.commit()
-                result = {'success': True}
-                
-            elif path == 'matches':
-                cur.execute('DELETE FROM matches WHERE id = %s', (item_id,))
-                conn.commit()
-                result = {'success': True}
-                
-            elif path == 'social-links':
-                cur.execute('DELETE FROM social_links WHERE id = %s', (item_id,))
-                conn.commit()
-                result = {'success': True}
-                
-            elif path == 'champions':
-                cur.execute('DELETE FROM champions WHERE id = %s', (item_id,))
-                conn.commit()
-                result = {'success': True}
-                
-            else:
-                result = {'error': 'Unknown path'}
-        else:
-            result = {'error': 'Method not allowed'}
-            
-        cur.close()
-        conn.close()
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'isBase64Encoded': False,
-            'body': json.dumps(result, ensure_ascii=False, default=str)
-        }
-        
-    except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'isBase64Encoded': False,
-            'body': json.dumps({'error': str(e)}, ensure_ascii=False)
-        }
\ No newline at end of file
+        result = archive_season(conn.cursor(cursor_factory=RealDictCursor), req.data)
+    except LookupError as e:
+        raise HttpError(404, str(e))
+    except SeasonConflict as e:
+        raise HttpError(409, str(e))
+    conn.commit()
+    return {'success': True, **result}
+
+@router.route('POST', 'regulations', invalidates=('regulations', 'homepage'), body=REGULATIONS_BODY)
+def update_regulations(req: Request, conn) -> Dict[str, Any]:
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute('UPDATE regulations SET content = %s, updated_at = CURRENT_TIMESTAMP WHERE id = 1',
+               (req.data.get('content'),))
+    conn.commit()
+    return {'success': True}
+
+@router.route('POST', 'champions', invalidates=('champions', 'homepage'), body=CHAMPION_BODY)
+def create_champion(req: Request, conn) -> Dict[str, Any]:
+    body_data = req.data
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute('INSERT INTO champions (season, team_id, team_name, description) VALUES (%s, %s, %s, %s)',
+               (body_data.get('season'), body_data.get('team_id'),
+                body_data.get('team_name'), body_data.get('description')))
+    conn.commit()
+    return {'success': True}
+
+@router.route('PUT', 'teams', invalidates=('teams', 'matches', 'team-stats', 'homepage'), body=TEAM_UPDATE_BODY)
+def update_team(req: Request, conn) -> Dict[str, Any]:
+    body_data = req.data
+    team_id = body_data.get('id')
+    cur = conn.cursor()
+    cur.execute('SELECT division FROM teams WHERE id = %s', (team_id,))
+    row = cur.fetchone()
+    if row and row[0] != body_data.get('division'):
+        # Перенос в другой дивизион: старый сжимается без пропуска, команда встает последней в новом
+        orders = lock_divisions(cur, [row[0], body_data.get('division')])
+        old_order = [existing for existing in orders[row[0]] if existing != team_id]
+        new_order = [existing for existing in orders[body_data.get('division')] if existing != team_id] + [team_id]
+        cur.execute('UPDATE teams SET division = %s WHERE id = %s', (body_data.get('division'), team_id))
+        apply_order(cur, old_order)
+        apply_order(cur, new_order)
+    cur.execute('''UPDATE teams SET name = %s, division = %s, games_played = %s,
+                   wins = %s, wins_ot = %s, losses_ot = %s, losses = %s,
+                   goals_for = %s, goals_against = %s, points = %s, logo_url = %s WHERE id = %s''',
+               (body_data.get('name'), body_data.get('division'),
+                body_data.get('games_played'), body_data.get('wins'),
+                body_data.get('wins_ot'), body_data.get('losses_ot'),
+                body_data.get('losses'), body_data.get('goals_for'),
+                body_data.get('goals_against'), body_data.get('points'),
+                externalize(body_data.get('logo_url')), team_id))
+    conn.commit()
+    return {'success': True}
+
+@router.route('PUT', 'matches', invalidates=('matches', 'teams', 'team-stats', 'homepage'), body=MATCH_UPDATE_BODY)
+def update_match(req: Request, conn) -> Dict[str, Any]:
+    body_data = req.data
+    item_id = body_data.get('id')
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute(LOCK_MATCH_SQL, (item_id,))
+    old_match = cur.fetchone()
+    cur.execute(UPDATE_MATCH_SQL,
+               (body_data.get('season_id'), body_data.get('match_date'), body_data.get('home_team_id'),
+                body_data.get('away_team_id'), body_data.get('home_score'),
+                body_data.get('away_score'), body_data.get('status'),
+                old_match and old_match['season_id'], item_id))
+    new_match = cur.fetchone()
+    apply_match_change(cur, old_match, new_match)
+    apply_match_analytics(cur, old_match, new_match)
+    conn.commit()
+    return {'success': True}
+
+@router.route('DELETE', 'teams', invalidates=('teams', 'matches', 'team-stats', 'homepage'), query=ID_QUERY)
+def delete_team(req: Request, conn) -> Dict[str, Any]:
+    team_id = req.query['id']
+    cur = conn.cursor()
+    _, order = lock_division(cur, team_id=team_id)
+    cur.execute('DELETE FROM teams WHERE id = %s', (team_id,))
+    apply_order(cur, [existing for existing in order if existing != team_id])
+    conn.commit()
+    return {'success': True}
+
+@router.route('DELETE', 'matches', invalidates=('matches', 'teams', 'team-stats', 'homepage'), query=ID_QUERY)
+def delete_match(req: Request, conn) -> Dict[str, Any]:
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute(DELETE_MATCH_SQL, (req.query['id'],))
+    old_match = cur.fetchone()
+    apply_match_change(cur, old_match, None)
+    apply_match_analytics(cur, old_match, None)
+    conn.commit()
+    return {'success': True}
+
+@router.route('DELETE', 'social-links', invalidates=('league-info', 'homepage'), query=ID_QUERY)
+def delete_social_link(req: Request, conn) -> Dict[str, Any]:
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute('DELETE FROM social_links WHERE id = %s', (req.query['id'],))
+    conn.commit()
+    return {'success': True}
+
+@router.route('DELETE', 'champions', invalidates=('champions', 'homepage'), query=ID_QUERY)
+def delete_champion(req: Request, conn) -> Dict[str, Any]:
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute('DELETE FROM champions WHERE id = %s', (req.query['id'],))
+    conn.commit()
+    return {'success': True}
+
+@traced('api')
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    return router.dispatch(event, context)
+
+router.startup()
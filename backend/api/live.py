@@ -0,0 +1,154 @@
+'''
+Business: Live-обновления счета матчей - один LISTEN на теплый инстанс и long-poll с since=version для всех зрителей
+Args: since - последняя версия, которую видел клиент; timeout - сколько секунд ждать (не больше LIVE_MAX_WAIT_SECONDS)
+Returns: {version, events}; events - изменения счета и статуса с версией больше since;
+         since впереди ленты и БД - {version: текущая, events: [], resync: true}, клиент перечитывает матчи
+Соединения: LISTEN держит собственное соединение вне пула (оно занято на все время жизни инстанса),
+            дочитывание из таблицы берет пул только когда буфера не хватает - поэтому маршрут live объявлен без БД
+'''
+import json
+import os
+import select
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import psycopg2
+import psycopg2.extensions
+from db import connection
+
+CHANNEL = 'match_events'
+BUFFER_SIZE = int(os.environ.get('LIVE_BUFFER_SIZE', '1000'))
+MAX_WAIT_SECONDS = float(os.environ.get('LIVE_MAX_WAIT_SECONDS', '25'))
+CATCH_UP_LIMIT = 500
+PING_SECONDS = float(os.environ.get('LIVE_PING_SECONDS', '10'))
+RECONNECT_SECONDS = 1.0
+
+EVENTS_SQL = '''
+    SELECT version, match_id, home_score, away_score, status, created_at
+    FROM match_events
+    WHERE version > %s
+    ORDER BY version
+    LIMIT %s
+'''
+
+class LiveFeed:
+    def __init__(self, channel: str = CHANNEL, buffer_size: int = BUFFER_SIZE):
+        self.channel = channel
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._version = 0
+        self._floor = 0
+        self._ready = threading.Event()
+        self._changed = threading.Condition()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._listen_conn = None
+        self.notifications = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='live-feed', daemon=True)
+                self._thread.start()
+
+    def _connect(self):
+        conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN {self.channel}')
+            cur.execute('SELECT COALESCE(MAX(version), 0) FROM match_events')
+            version = cur.fetchone()[0]
+        with self._changed:
+            # Уведомления, пропущенные без LISTEN, клиенты дочитают из таблицы: since < floor
+            if version > self._version:
+                self._events.clear()
+                self._version = version
+            self._floor = self._version
+            self._changed.notify_all()
+        return conn
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._listen_conn = self._connect()
+                self._ready.set()
+                while True:
+                    if select.select([self._listen_conn], [], [], PING_SECONDS) == ([], [], []):
+                        # Проверка, что соединение живо после заморозки инстанса; заодно забирает уведомления
+                        with self._listen_conn.cursor() as cur:
+                            cur.execute('SELECT 1')
+                    else:
+                        self._listen_conn.poll()
+                    while self._listen_conn.notifies:
+                        self.publish(json.loads(self._listen_conn.notifies.pop(0).payload))
+            except (psycopg2.Error, OSError, ValueError):
+                self._ready.clear()
+                try:
+                    if self._listen_conn is not None:
+                        self._listen_conn.close()
+                except psycopg2.Error:
+                    pass
+                time.sleep(RECONNECT_SECONDS)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        with self._changed:
+            if event['version'] <= self._version:
+                return
+            self._events.append(event)
+            self._version = event['version']
+            if len(self._events) == self._events.maxlen:
+                self._floor = self._events[0]['version'] - 1
+            self.notifications += 1
+            self._changed.notify_all()
+
+    def _since(self, since: int) -> Optional[List[Dict[str, Any]]]:
+        if since < self._floor:
+            return None
+        return [event for event in self._events if event['version'] > since]
+
+    def wait(self, since: Optional[int], timeout: float) -> Tuple[int, Optional[List[Dict[str, Any]]]]:
+        self.start()
+        deadline = time.monotonic() + timeout
+        if not self._ready.wait(timeout):
+            return self._version, None
+        with self._changed:
+            if since is None:
+                return self._version, []
+            if since > self._version:
+                # Клиент впереди ленты: проверит catch_up по таблице, а не ждать несуществующих версий
+                return self._version, None
+            while True:
+                events = self._since(since)
+                remaining = deadline - time.monotonic()
+                if events != [] or remaining <= 0:
+                    return self._version, events
+                self._changed.wait(remaining)
+
+def catch_up(since: Optional[int]) -> Tuple[int, Optional[List[Dict[str, Any]]]]:
+    # Версия в ответе не больше текущей в БД; None вместо событий - since впереди БД, нужна пересинхронизация
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute('SELECT COALESCE(MAX(version), 0) FROM match_events')
+            current = cur.fetchone()[0]
+            if since is None:
+                return current, []
+            if since > current:
+                return current, None
+            cur.execute(EVENTS_SQL, (since, CATCH_UP_LIMIT))
+            columns = [column[0] for column in cur.description]
+            events = [dict(zip(columns, row), created_at=row[-1].isoformat()) for row in cur.fetchall()]
+    return (events[-1]['version'] if events else since), events
+
+def wait_timeout(value: Any) -> float:
+    # Coerce для LIVE_QUERY: ожидание дольше LIVE_MAX_WAIT_SECONDS обрезается, а не отклоняется
+    return max(0.0, min(float(value), MAX_WAIT_SECONDS))
+
+live_feed = LiveFeed()
+
+def poll_events(since: Optional[int], timeout: float) -> Dict[str, Any]:
+    version, events = live_feed.wait(since, timeout)
+    if events is None:
+        version, events = catch_up(since)
+        if events is None:
+            return {'version': version, 'events': [], 'resync': True}
+    return {'version': version, 'events': events}
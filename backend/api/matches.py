@@ -0,0 +1,97 @@
+'''
+Business: Выборка календаря матчей с фильтрами и keyset-пагинацией по (match_date, id)
+Args: cur - курсор БД, params - приведенные по MATCHES_QUERY параметры (season, team_id, division, status, date_from, date_to, limit,
+      cursor - уже разобранная decode_cursor пара (match_date, id))
+Returns: список матчей или страница {items, next_cursor} при запросе с limit/cursor
+'''
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from seasons import season_filter
+from sqljson import fetch_json_array
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+MATCHES_SELECT = '''
+    SELECT m.*,
+           ht.name as home_team_name,
+           at.name as away_team_name
+    FROM matches m
+    LEFT JOIN teams ht ON m.home_team_id = ht.id
+    LEFT JOIN teams at ON m.away_team_id = at.id
+'''
+
+def encode_cursor(match_date: datetime, match_id: int) -> str:
+    raw = f'{match_date.isoformat()}|{match_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    if not isinstance(cursor, str):
+        raise ValueError('Invalid cursor')
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        match_date, match_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(match_date), int(match_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+
+def build_matches_query(params: Dict[str, Any]) -> Tuple[str, List[Any], Optional[int]]:
+    conditions: List[str] = []
+    args: List[Any] = []
+
+    season_condition, season_args = season_filter(params)
+    if season_condition:
+        conditions.append(season_condition)
+        args.extend(season_args)
+
+    if params.get('team_id'):
+        team_id = params['team_id']
+        conditions.append('(m.home_team_id = %s OR m.away_team_id = %s)')
+        args.extend([team_id, team_id])
+    if params.get('division'):
+        conditions.append('''(m.home_team_id IN (SELECT id FROM teams WHERE division = %s)
+                              OR m.away_team_id IN (SELECT id FROM teams WHERE division = %s))''')
+        args.extend([params['division'], params['division']])
+    if params.get('status'):
+        conditions.append('m.status = %s')
+        args.append(params['status'])
+    if params.get('date_from'):
+        conditions.append('m.match_date >= %s')
+        args.append(params['date_from'])
+    if params.get('date_to'):
+        conditions.append('m.match_date <= %s')
+        args.append(params['date_to'])
+
+    paginated = 'limit' in params or 'cursor' in params
+    limit = None
+    if paginated:
+        limit = max(1, min(params.get('limit') or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+        if params.get('cursor'):
+            match_date, match_id = params['cursor']
+            conditions.append('(m.match_date, m.id) < (%s, %s)')
+            args.extend([match_date, match_id])
+
+    query = MATCHES_SELECT
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    query += ' ORDER BY m.match_date DESC, m.id DESC'
+    if limit is not None:
+        query += ' LIMIT %s'
+        args.append(limit + 1)
+    return query, args, limit
+
+def list_matches(cur, params: Dict[str, Any], mode: str = '') -> Any:
+    query, args, limit = build_matches_query(params)
+    if mode == 'sql' and limit is None:
+        return fetch_json_array(cur, query, args)
+    cur.execute(query, args)
+    rows = [dict(row) for row in cur.fetchall()]
+    if limit is None:
+        return rows
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['match_date'], rows[-1]['id'])
+    return {'items': rows, 'next_cursor': next_cursor}
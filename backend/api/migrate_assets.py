@@ -0,0 +1,51 @@
+'''
+Business: Разовый перенос встроенных base64-логотипов из БД в хранилище изображений
+Args: DATABASE_URL и настройки хранилища из окружения (ASSET_DIR или ASSET_STORE обязательны), флаг --dry-run
+Returns: отчет о перенесенных логотипах команд и лиги; без постоянного хранилища - код 1 и БД не меняется;
+         --dry-run ничего не пишет ни в хранилище, ни в БД - только печатает ключи и размеры файлов, которые были бы записаны
+'''
+import sys
+from typing import Dict, List
+from assets import AssetStoreNotConfigured, get_store, plan_image
+from db import connection
+
+LOGO_TABLES = ('teams', 'league_info')
+
+def migrate_inline_logos(dry_run: bool = False) -> Dict[str, List[int]]:
+    store = get_store()
+    migrated: Dict[str, List[int]] = {table: [] for table in LOGO_TABLES}
+    with connection() as conn:
+        cur = conn.cursor()
+        for table in LOGO_TABLES:
+            lock = '' if dry_run else ' FOR UPDATE'
+            cur.execute(f"SELECT id, logo_url FROM {table} WHERE logo_url LIKE 'data:image%%'{lock}")
+            for row_id, logo_url in cur.fetchall():
+                try:
+                    asset, pending = plan_image(logo_url, store)
+                except ValueError as e:
+                    print(f'{table}#{row_id}: skipped ({e})', file=sys.stderr)
+                    continue
+                if dry_run:
+                    for key, payload in pending:
+                        print(f'{table}#{row_id}: would write {key} ({len(payload)} bytes)')
+                else:
+                    for key, payload in pending:
+                        store.put(key, payload, str(asset['content_type']))
+                    cur.execute(f'UPDATE {table} SET logo_url = %s WHERE id = %s', (asset['url'], row_id))
+                migrated[table].append(row_id)
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+        cur.close()
+    return migrated
+
+if __name__ == '__main__':
+    try:
+        report = migrate_inline_logos(dry_run='--dry-run' in sys.argv[1:])
+    except AssetStoreNotConfigured as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    verb = 'would be moved' if '--dry-run' in sys.argv[1:] else 'moved'
+    for table, ids in report.items():
+        print(f'{table}: {len(ids)} logo(s) {verb} to the asset store {ids}')
@@ -0,0 +1,107 @@
+'''
+Business: Атомарная перестановка команд внутри дивизиона с перенумерацией sort_order без пропусков
+Args: body - {division, team_ids} (полный порядок) или {team_id, new_position} (перемещение одной команды)
+Returns: новый порядок id команд дивизиона; sort_order = 0..n-1 записывается одним UPDATE ... FROM (VALUES ...)
+Общий модуль: api берет lock_division/apply_order, чтобы создание, перенос и удаление команды тоже нумеровали без пропусков
+'''
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+DIVISIONS = ('ПХЛ', 'ВХЛ', 'ТХЛ')
+
+class ReorderConflict(Exception):
+    pass
+
+class ReorderRequest(NamedTuple):
+    division: Optional[str]
+    team_ids: Optional[List[int]]
+    team_id: Optional[int]
+    new_position: Optional[int]
+
+def _int(value: Any, name: str) -> int:
+    if isinstance(value, bool):
+        raise ValueError(f'{name} must be an integer')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be an integer')
+
+def parse_reorder(body_data: Any) -> ReorderRequest:
+    if not isinstance(body_data, dict):
+        raise ValueError('Request body must be a JSON object')
+    division = body_data.get('division')
+    if division is not None and division not in DIVISIONS:
+        raise ValueError('division must be one of: ' + ', '.join(DIVISIONS))
+
+    team_ids = body_data.get('team_ids')
+    if team_ids is not None:
+        if division is None or not isinstance(team_ids, list) or not team_ids:
+            raise ValueError('division and a non-empty team_ids list required')
+        ids = [_int(team_id, 'team_ids') for team_id in team_ids]
+        if len(set(ids)) != len(ids):
+            raise ValueError('team_ids must not contain duplicates')
+        return ReorderRequest(division, ids, None, None)
+
+    if not body_data.get('team_id') or body_data.get('new_position') is None:
+        raise ValueError('team_id and new_position required')
+    new_position = _int(body_data.get('new_position'), 'new_position')
+    if new_position < 0:
+        raise ValueError('new_position must be non-negative')
+    return ReorderRequest(division, None, _int(body_data.get('team_id'), 'team_id'), new_position)
+
+_DIVISION_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('teams:' || %s))"
+
+_LOCK_SQL = '''
+    SELECT id, sort_order, division FROM teams
+    WHERE division = {division}
+    ORDER BY id FOR UPDATE
+'''
+
+def lock_division(cur, division: Optional[str] = None, team_id: Optional[int] = None) -> Tuple[Optional[str], List[int]]:
+    # Строки блокируются в порядке id: порядок по sort_order меняется между транзакциями и дает дедлоки
+    if division is None:
+        cur.execute(_LOCK_SQL.format(division='(SELECT division FROM teams WHERE id = %s)'), (team_id,))
+    else:
+        # FOR UPDATE не видит вставок соседней транзакции и пустого дивизиона - новые команды сериализует advisory lock
+        cur.execute(_DIVISION_LOCK_SQL, (division,))
+        cur.execute(_LOCK_SQL.format(division='%s'), (division,))
+    rows = cur.fetchall()
+    order = [row_id for row_id, _, _ in sorted(rows, key=lambda row: (row[1], row[0]))]
+    return (rows[0][2] if rows else division), order
+
+def moved(current: List[int], team_id: int, new_position: int) -> List[int]:
+    order = [existing for existing in current if existing != team_id]
+    order.insert(min(new_position, len(order)), team_id)
+    return order
+
+def lock_divisions(cur, divisions: List[str]) -> Dict[str, List[int]]:
+    # Несколько дивизионов - в порядке названий, по той же причине, что и строки в порядке id
+    return {division: lock_division(cur, division)[1] for division in sorted(set(divisions))}
+
+def apply_order(cur, order: List[int]) -> None:
+    if not order:
+        return
+    values_sql = ', '.join(['(%s, %s)'] * len(order))
+    params: List[int] = []
+    for position, team_id in enumerate(order):
+        params.extend((team_id, position))
+    cur.execute(f'''
+        UPDATE teams t SET sort_order = d.position
+        FROM (VALUES {values_sql}) AS d(id, position)
+        WHERE t.id = d.id AND t.sort_order IS DISTINCT FROM d.position
+    ''', params)
+
+def reorder(cur, request: ReorderRequest) -> Dict[str, Any]:
+    division, current = lock_division(cur, request.division, request.team_id)
+    if request.team_ids is not None:
+        if sorted(request.team_ids) != sorted(current):
+            raise ReorderConflict('team_ids must list every team of the division exactly once')
+        order = request.team_ids
+    else:
+        if request.team_id not in current:
+            if request.division is not None:
+                raise LookupError(f'Team {request.team_id} not found in division {request.division}')
+            raise LookupError(f'Team {request.team_id} not found')
+        order = moved(current, request.team_id, request.new_position)
+
+    apply_order(cur, order)
+    return {'division': division, 'team_ids': order}
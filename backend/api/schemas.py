@@ -0,0 +1,92 @@
+'''
+Business: Схемы параметров и тел запросов API - дивизионы и статусы матча из CHECK-ограничений миграций
+Args: схемы передаются в router.route(query=..., body=...), проверяются до соединения с БД
+Returns: Schema для каждого маршрута; значения приходят в обработчик уже приведенными
+'''
+from live import MAX_WAIT_SECONDS, wait_timeout
+from matches import decode_cursor
+from schema import Field, Schema, integer, one_of, text, timestamp
+from standings import MATCH_STATUSES, STAT_FIELDS
+
+DIVISIONS = ('ПХЛ', 'ВХЛ', 'ТХЛ')
+
+ID_QUERY = Schema(id=Field(integer(1), required=True))
+
+TEAMS_QUERY = Schema(
+    division=Field(one_of(DIVISIONS)),
+    season=Field(text(20))
+)
+
+MATCHES_QUERY = Schema(
+    season=Field(text(20)),
+    team_id=Field(integer(1)),
+    division=Field(one_of(DIVISIONS)),
+    status=Field(one_of(MATCH_STATUSES)),
+    date_from=Field(timestamp),
+    date_to=Field(timestamp),
+    limit=Field(integer()),
+    cursor=Field(decode_cursor)
+)
+
+LIVE_QUERY = Schema(
+    since=Field(integer(0)),
+    timeout=Field(wait_timeout, default=MAX_WAIT_SECONDS)
+)
+
+TEAM_STATS_QUERY = Schema(
+    team_id=Field(integer(1), required=True),
+    opponent_id=Field(integer(1))
+)
+
+HOMEPAGE_QUERY = Schema(
+    matches_limit=Field(integer()),
+    players_limit=Field(integer())
+)
+
+LEAGUE_INFO_BODY = Schema(
+    league_name=Field(text(100), required=True),
+    description=Field(text(strip=False)),
+    logo_url=Field(text(strip=False))
+)
+
+IMAGE_BODY = Schema(image=Field(text(), required=True))
+
+SOCIAL_LINK_BODY = Schema(
+    platform=Field(text(50), required=True),
+    url=Field(text(), required=True),
+    icon=Field(text(50), default='Link'),
+    sort_order=Field(integer(), default=0)
+)
+
+_TEAM_FIELDS = dict(
+    name=Field(text(100), required=True),
+    division=Field(one_of(DIVISIONS), required=True),
+    **{field: Field(integer()) for field in STAT_FIELDS}
+)
+
+TEAM_BODY = Schema(**_TEAM_FIELDS)
+TEAM_UPDATE_BODY = Schema(id=Field(integer(1), required=True), logo_url=Field(text(strip=False)), **_TEAM_FIELDS)
+
+_MATCH_FIELDS = dict(
+    season_id=Field(integer(1)),
+    match_date=Field(timestamp, required=True),
+    home_team_id=Field(integer(1), required=True),
+    away_team_id=Field(integer(1), required=True),
+    home_score=Field(integer(0), default=0),
+    away_score=Field(integer(0), default=0),
+    status=Field(one_of(MATCH_STATUSES), default='Не начался')
+)
+
+MATCH_BODY = Schema(**_MATCH_FIELDS)
+MATCH_UPDATE_BODY = Schema(**dict(_MATCH_FIELDS, id=Field(integer(1), required=True),
+                                  status=Field(one_of(MATCH_STATUSES), required=True)))
+
+REGULATIONS_BODY = Schema(content=Field(text(strip=False)))
+
+CHAMPION_BODY = Schema(
+    season=Field(text(20), required=True),
+    team_id=Field(integer(1)),
+    team_name=Field(text(255), required=True),
+    description=Field(text(strip=False))
+)
+
@@ -0,0 +1,109 @@
+'''
+Business: Инкрементальный пересчет турнирной таблицы текущего сезона по изменению одного матча
+Args: cur - курсор открытой транзакции, old/new - строки матча до и после изменения
+Returns: None, статистика команд обновляется в рамках текущей транзакции
+'''
+from typing import Dict, Any, Optional
+
+FINAL_STATUSES = ['Конец матча', 'Конец матча (ОТ)', 'Конец матча (Б)']
+EXTRA_TIME_STATUSES = ['Конец матча (ОТ)', 'Конец матча (Б)']
+# Все статусы из CHECK-ограничения matches.status (V0001)
+MATCH_STATUSES = ['Не начался', 'Матч идет', 'Конец матча', 'Конец матча (ОТ)', 'Конец матча (Б)', 'Техническое поражение']
+STAT_FIELDS = ('games_played', 'wins', 'wins_ot', 'losses_ot', 'losses', 'goals_for', 'goals_against', 'points')
+
+MATCH_COLUMNS = ('id, season_id, home_team_id, away_team_id, home_score, away_score, status, '
+                 'season_id = (SELECT id FROM seasons WHERE is_current) as current_season')
+
+def _team_result(goals_for: int, goals_against: int, status: str) -> Dict[str, int]:
+    extra_time = status in EXTRA_TIME_STATUSES
+    stats = dict.fromkeys(STAT_FIELDS, 0)
+    stats['games_played'] = 1
+    stats['goals_for'] = goals_for
+    stats['goals_against'] = goals_against
+    if goals_for > goals_against:
+        stats['wins_ot' if extra_time else 'wins'] = 1
+    elif goals_for < goals_against:
+        stats['losses_ot' if extra_time else 'losses'] = 1
+    stats['points'] = stats['wins'] * 2 + stats['wins_ot'] * 2 + stats['losses_ot'] * 1
+    return stats
+
+def match_contribution(match: Optional[Dict[str, Any]]) -> Dict[int, Dict[str, int]]:
+    if not match or not match.get('current_season') or match.get('status') not in FINAL_STATUSES:
+        return {}
+    home_score = int(match.get('home_score') or 0)
+    away_score = int(match.get('away_score') or 0)
+    result: Dict[int, Dict[str, int]] = {}
+    if match.get('home_team_id') is not None:
+        result[int(match['home_team_id'])] = _team_result(home_score, away_score, match['status'])
+    if match.get('away_team_id') is not None:
+        away = _team_result(away_score, home_score, match['status'])
+        existing = result.get(int(match['away_team_id']))
+        if existing:
+            for field in STAT_FIELDS:
+                existing[field] += away[field]
+        else:
+            result[int(match['away_team_id'])] = away
+    return result
+
+def standings_delta(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> Dict[int, Dict[str, int]]:
+    delta: Dict[int, Dict[str, int]] = {}
+    for sign, match in ((-1, old), (1, new)):
+        for team_id, stats in match_contribution(match).items():
+            team_delta = delta.setdefault(team_id, dict.fromkeys(STAT_FIELDS, 0))
+            for field in STAT_FIELDS:
+                team_delta[field] += sign * stats[field]
+    return {team_id: stats for team_id, stats in delta.items() if any(stats.values())}
+
+_DELTA_ROW = '(' + ', '.join(['%s'] * (len(STAT_FIELDS) + 1)) + ')'
+_DELTA_ASSIGNMENTS = ', '.join(f'{field} = COALESCE(t.{field}, 0) + d.{field}' for field in STAT_FIELDS)
+
+# В дельте до четырех команд (старая и новая пара при смене соперников) - все варианты запроса готовы при импорте
+APPLY_DELTA_SQL = {
+    teams: f'''
+        UPDATE teams t SET {_DELTA_ASSIGNMENTS}
+        FROM (VALUES {', '.join([_DELTA_ROW] * teams)}) AS d(id, {', '.join(STAT_FIELDS)})
+        WHERE t.id = d.id
+    '''
+    for teams in range(1, 5)
+}
+
+def apply_match_change(cur, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+    delta = standings_delta(old, new)
+    if not delta:
+        return
+
+    params = []
+    for team_id, stats in delta.items():
+        params.append(team_id)
+        params.extend(stats[field] for field in STAT_FIELDS)
+    cur.execute(APPLY_DELTA_SQL[len(delta)], params)
+
+def rebuild_team_stats(cur) -> None:
+    cur.execute('''
+        UPDATE teams t SET
+            games_played = s.games_played, wins = s.wins, wins_ot = s.wins_ot, losses_ot = s.losses_ot,
+            losses = s.losses, goals_for = s.goals_for, goals_against = s.goals_against,
+            points = s.wins * 2 + s.wins_ot * 2 + s.losses_ot * 1
+        FROM (
+            SELECT
+                tm.id,
+                COUNT(r.team_id) as games_played,
+                COUNT(*) FILTER (WHERE r.goals_for > r.goals_against AND NOT r.extra_time) as wins,
+                COUNT(*) FILTER (WHERE r.goals_for > r.goals_against AND r.extra_time) as wins_ot,
+                COUNT(*) FILTER (WHERE r.goals_for < r.goals_against AND r.extra_time) as losses_ot,
+                COUNT(*) FILTER (WHERE r.goals_for < r.goals_against AND NOT r.extra_time) as losses,
+                COALESCE(SUM(r.goals_for), 0) as goals_for,
+                COALESCE(SUM(r.goals_against), 0) as goals_against
+            FROM teams tm
+            LEFT JOIN (
+                SELECT home_team_id as team_id, COALESCE(home_score, 0) as goals_for,
+                       COALESCE(away_score, 0) as goals_against, status = ANY(%(extra)s) as extra_time
+                FROM matches WHERE season_id = (SELECT id FROM seasons WHERE is_current) AND status = ANY(%(final)s)
+                UNION ALL
+                SELECT away_team_id, COALESCE(away_score, 0), COALESCE(home_score, 0), status = ANY(%(extra)s)
+                FROM matches WHERE season_id = (SELECT id FROM seasons WHERE is_current) AND status = ANY(%(final)s)
+            ) r ON r.team_id = tm.id
+            GROUP BY tm.id
+        ) s
+        WHERE t.id = s.id
+    ''', {'final': FINAL_STATUSES, 'extra': EXTRA_TIME_STATUSES})
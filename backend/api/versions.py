@@ -0,0 +1,72 @@
+'''
+Business: Версии ресурсов для ETag / Last-Modified и условных GET-запросов (304)
+Args: conn - соединение с БД, tables - таблицы, от которых зависит ответ
+Returns: ResourceVersion с etag и временем последнего изменения
+'''
+import hashlib
+import time
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+def http_date(timestamp: float) -> str:
+    # То же, что email.utils.formatdate(usegmt=True), без импорта email (~13 мс холодного старта)
+    t = time.gmtime(timestamp)
+    return (f'{WEEKDAYS[t.tm_wday]}, {t.tm_mday:02d} {MONTHS[t.tm_mon - 1]} {t.tm_year} '
+            f'{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d} GMT')
+
+class ResourceVersion(NamedTuple):
+    etag: str
+    last_modified: Optional[float]
+
+    def headers(self) -> Dict[str, str]:
+        headers = {'ETag': self.etag, 'Cache-Control': 'no-cache'}
+        if self.last_modified is not None:
+            headers['Last-Modified'] = http_date(self.last_modified)
+        return headers
+
+def fetch_version(conn, cache_key: Any, tables: Iterable[str]) -> ResourceVersion:
+    tables = sorted(tables)
+    with conn.cursor() as cur:
+        cur.execute(
+            'SELECT table_name, version, EXTRACT(EPOCH FROM updated_at) FROM table_versions WHERE table_name = ANY(%s) ORDER BY table_name',
+            (tables,)
+        )
+        rows = cur.fetchall()
+    token = repr((cache_key, [(name, version) for name, version, _ in rows]))
+    etag = '"' + hashlib.sha1(token.encode('utf-8')).hexdigest()[:20] + '"'
+    stamps = [float(stamp) for _, _, stamp in rows if stamp is not None]
+    return ResourceVersion(etag, max(stamps) if stamps else None)
+
+def _header(event: Dict[str, Any], name: str) -> Optional[str]:
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+def is_not_modified(event: Dict[str, Any], version: ResourceVersion) -> bool:
+    if_none_match = _header(event, 'if-none-match')
+    if if_none_match:
+        candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in candidates or version.etag in candidates
+
+    if_modified_since = _header(event, 'if-modified-since')
+    if if_modified_since and version.last_modified is not None:
+        from email.utils import parsedate_to_datetime
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(version.last_modified) <= int(since)
+    return False
+
+def not_modified_response(version: ResourceVersion) -> Dict[str, Any]:
+    headers = {'Access-Control-Allow-Origin': '*'}
+    headers.update(version.headers())
+    return {
+        'statusCode': 304,
+        'headers': headers,
+        'isBase64Encoded': False,
+        'body': ''
+    }
@@ -0,0 +1,43 @@
+'''
+Business: Быстрая сериализация больших списков (orjson с нативными датами) и выбор fast path
+Args: params - queryStringParameters (fast=sql|orjson), по умолчанию режим из JSON_FAST_PATH
+Returns: режим сериализации и JSON-строка ответа
+'''
+import importlib.util
+import json
+import os
+from typing import Any, Dict
+
+JSON_FAST_PATH = os.environ.get('JSON_FAST_PATH', '')
+FAST_MODES = ('', 'sql', 'orjson')
+
+# orjson тянет за собой dataclasses, uuid и zoneinfo (~20 мс холодного старта) - грузим только для fast=orjson
+HAS_ORJSON = importlib.util.find_spec('orjson') is not None
+_orjson: Any = None
+
+def _load_orjson() -> Any:
+    global _orjson
+    if _orjson is None:
+        import orjson
+        _orjson = orjson
+    return _orjson
+
+def fast_mode(params: Dict[str, Any]) -> str:
+    mode = params.get('fast', JSON_FAST_PATH) or ''
+    if mode not in FAST_MODES:
+        raise ValueError('fast must be one of: sql, orjson')
+    if mode == 'orjson' and not HAS_ORJSON:
+        return ''
+    return mode
+
+def _default(value: Any) -> Any:
+    # Даты в ISO 8601 с T - как отдают orjson и to_json в SQL, какой бы путь ни выбрал запрос
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+def dumps(obj: Any, mode: str = '') -> str:
+    if mode == 'orjson':
+        orjson = _load_orjson()
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, default=_default)
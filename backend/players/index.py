@@ -3,185 +3,122 @@ Business: Управление игроками и их статистикой
 Args: event - dict с httpMethod, queryStringParameters, body
 Returns: HTTP response dict
 '''
-import json
-import os
-import psycopg2
-from typing import Dict, Any
+from cache import response_cache
+from db import connection
+from fastjson import fast_mode
+from instrument import traced
+from leaderboard import SORT_ORDERS, fetch_leaderboard, leaderboard_query, parse_page, refresh_player
+from runtime import NO_DB, READ_AFTER_HEADER, READ_ONLY, HttpError, Request, Router
+from schema import Field, Schema, integer, one_of, text
+from seasons import archived_season
+from sqljson import fetch_json_array
+from stats_import import DIVISIONS, apply_rows, missing_players, parse_rows
+from typing import Dict, Any, List
 
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    method: str = event.get('httpMethod', 'GET')
-    
-    if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-Admin-Token',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': ''
-        }
-    
-    dsn = os.environ.get('DATABASE_URL')
-    conn = psycopg2.connect(dsn)
+RESOURCE_TABLES = ('players', 'teams', 'player_leaderboard', 'seasons', 'season_player_stats')
+
+router = Router('players', 'Content-Type, X-Admin-Token, If-None-Match, If-Modified-Since')
+
+PLAYERS_QUERY = Schema(
+    sort=Field(one_of(SORT_ORDERS), default='goals'),
+    limit=Field(integer()),
+    offset=Field(integer(), default=0),
+    division=Field(one_of(DIVISIONS)),
+    season=Field(text(20))
+)
+
+PLAYER_BODY = Schema(
+    team_id=Field(integer(1), required=True),
+    nickname=Field(text(100), required=True),
+    jersey_number=Field(integer(0), required=True),
+    position=Field(text(50), required=True)
+)
+
+STATS_BODY = Schema(
+    player_id=Field(integer(1), required=True),
+    division=Field(one_of(DIVISIONS), required=True),
+    goals=Field(integer(0), default=0),
+    assists=Field(integer(0), default=0),
+    games_played=Field(integer(0), default=0)
+)
+
+def parse_import(req: Request) -> List[Dict[str, Any]]:
+    if req.headers.get('content-type', '').startswith('text/csv'):
+        body_data = {'csv': req.body}
+    else:
+        body_data = req.json()
+    rows, errors = parse_rows(body_data)
+    if errors and rows:
+        # Лист с ошибками не применяется: игроков проверяем на чтение, чтобы все ошибки пришли за один раунд
+        with connection(readonly=True, read_after=req.headers.get(READ_AFTER_HEADER.lower())) as conn:
+            errors = sorted(errors + missing_players(conn.cursor(), rows), key=lambda error: error['row'])
+    if errors:
+        raise HttpError(400, 'Invalid rows', {'success': False, 'errors': errors})
+    return rows
+
+@router.route('GET', 'cache-stats', db=NO_DB)
+def get_cache_stats(req: Request) -> Dict[str, Any]:
+    return {**response_cache.stats(), 'rejections': dict(router.rejections)}
+
+@router.route('GET', db=READ_ONLY, resources=RESOURCE_TABLES, query=PLAYERS_QUERY, prepare=lambda req: parse_page(req.query))
+def get_players(req: Request, conn) -> Any:
+    sort, limit, offset = req.data
+    division = req.query.get('division')
     cur = conn.cursor()
-    
-    if method == 'GET':
-        params = event.get('queryStringParameters') or {}
-        division = params.get('division')
-        
-        if division:
-            query = '''
-                SELECT 
-                    p.id, p.nickname, p.jersey_number, p.position,
-                    t.name as team_name, t.logo_url,
-                    ps.goals, ps.assists, ps.games_played, ps.division
-                FROM players p
-                JOIN teams t ON p.team_id = t.id
-                LEFT JOIN player_stats ps ON p.id = ps.player_id AND ps.division = %s
-                WHERE ps.division = %s OR ps.division IS NULL
-                ORDER BY ps.goals DESC NULLS LAST, ps.assists DESC NULLS LAST
-            '''
-            cur.execute(query, (division, division))
-        else:
-            query = '''
-                SELECT 
-                    p.id, p.nickname, p.jersey_number, p.position,
-                    t.name as team_name, t.logo_url,
-                    COALESCE(SUM(ps.goals), 0) as goals,
-                    COALESCE(SUM(ps.assists), 0) as assists,
-                    COALESCE(SUM(ps.games_played), 0) as games_played
-                FROM players p
-                JOIN teams t ON p.team_id = t.id
-                LEFT JOIN player_stats ps ON p.id = ps.player_id
-                GROUP BY p.id, p.nickname, p.jersey_number, p.position, t.name, t.logo_url
-                ORDER BY goals DESC, assists DESC
-            '''
-            cur.execute(query)
-        
-        rows = cur.fetchall()
-        
-        if division:
-            players = [
-                {
-                    'id': row[0],
-                    'nickname': row[1],
-                    'jersey_number': row[2],
-                    'position': row[3],
-                    'team_name': row[4],
-                    'team_logo': row[5],
-                    'goals': row[6] or 0,
-                    'assists': row[7] or 0,
-                    'games_played': row[8] or 0,
-                    'division': row[9]
-                }
-                for row in rows
-            ]
-        else:
-            players = [
-                {
-                    'id': row[0],
-                    'nickname': row[1],
-                    'jersey_number': row[2],
-                    'position': row[3],
-                    'team_name': row[4],
-                    'team_logo': row[5],
-                    'goals': row[6],
-                    'assists': row[7],
-                    'games_played': row[8]
-                }
-                for row in rows
-            ]
-        
-        cur.close()
-        conn.close()
-        
-        return {
-            'statusCode': 200,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'isBase64Encoded': False,
-            'body': json.dumps(players)
-        }
-    
-    if method == 'POST':
-        body_data = json.loads(event.get('body', '{}'))
-        
-        team_id = body_data.get('team_id')
-        nickname = body_data.get('nickname')
-        jersey_number = body_data.get('jersey_number')
-        position = body_data.get('position')
-        
-        if not all([team_id, nickname, jersey_number, position]):
-            cur.close()
-            conn.close()
-            return {
-                'statusCode': 400,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'error': 'Missing required fields'})
-            }
-        
-        cur.execute(
-            'INSERT INTO players (team_id, nickname, jersey_number, position) VALUES (%s, %s, %s, %s) RETURNING id',
-            (team_id, nickname, jersey_number, position)
-        )
-        player_id = cur.fetchone()[0]
-        conn.commit()
-        
-        cur.close()
-        conn.close()
-        
-        return {
-            'statusCode': 201,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'isBase64Encoded': False,
-            'body': json.dumps({'id': player_id, 'message': 'Player created'})
-        }
-    
-    if method == 'PUT':
-        body_data = json.loads(event.get('body', '{}'))
-        
-        player_id = body_data.get('player_id')
-        division = body_data.get('division')
-        goals = body_data.get('goals', 0)
-        assists = body_data.get('assists', 0)
-        games_played = body_data.get('games_played', 0)
-        
-        if not player_id or not division:
-            cur.close()
-            conn.close()
-            return {
-                'statusCode': 400,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'error': 'player_id and division required'})
-            }
-        
-        cur.execute(
-            '''
-            INSERT INTO player_stats (player_id, division, goals, assists, games_played)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (player_id, division) 
-            DO UPDATE SET goals = %s, assists = %s, games_played = %s, updated_at = CURRENT_TIMESTAMP
-            ''',
-            (player_id, division, goals, assists, games_played, goals, assists, games_played)
-        )
-        conn.commit()
-        
-        cur.close()
-        conn.close()
-        
-        return {
-            'statusCode': 200,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'isBase64Encoded': False,
-            'body': json.dumps({'success': True, 'message': 'Stats updated'})
-        }
-    
-    cur.close()
-    conn.close()
-    
-    return {
-        'statusCode': 405,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({'error': 'Method not allowed'})
-    }
+    try:
+        season_id = archived_season(cur, req.query)
+    except LookupError as e:
+        raise HttpError(404, str(e))
+    if fast_mode(req.params) == 'sql':
+        return fetch_json_array(cur, *leaderboard_query(division, sort, limit, offset, season_id))
+    return fetch_leaderboard(cur, division, sort, limit, offset, season_id)
+
+@router.route('POST', status=201, invalidates=('players',), body=PLAYER_BODY)
+def create_player(req: Request, conn) -> Dict[str, Any]:
+    body_data = req.data
+    cur = conn.cursor()
+    cur.execute(
+        'INSERT INTO players (team_id, nickname, jersey_number, position) VALUES (%s, %s, %s, %s) RETURNING id',
+        (body_data.get('team_id'), body_data.get('nickname'), body_data.get('jersey_number'), body_data.get('position'))
+    )
+    player_id = cur.fetchone()[0]
+    refresh_player(cur, player_id)
+    conn.commit()
+    return {'id': player_id, 'message': 'Player created'}
+
+@router.route('PUT', invalidates=('players',), body=STATS_BODY)
+def update_stats(req: Request, conn) -> Dict[str, Any]:
+    body_data = req.data
+    player_id = body_data.get('player_id')
+    goals = body_data['goals']
+    assists = body_data['assists']
+    games_played = body_data['games_played']
+    cur = conn.cursor()
+    cur.execute(
+        '''
+        INSERT INTO player_stats (player_id, division, goals, assists, games_played)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (player_id, division)
+        DO UPDATE SET goals = %s, assists = %s, games_played = %s, updated_at = CURRENT_TIMESTAMP
+        ''',
+        (player_id, body_data.get('division'), goals, assists, games_played, goals, assists, games_played)
+    )
+    refresh_player(cur, player_id)
+    conn.commit()
+    return {'success': True, 'message': 'Stats updated'}
+
+@router.route('POST', 'stats-import', invalidates=('players',), prepare=parse_import)
+def import_stats(req: Request, conn) -> Dict[str, Any]:
+    cur = conn.cursor()
+    errors = missing_players(cur, req.data)
+    if errors:
+        raise HttpError(400, 'Invalid rows', {'success': False, 'errors': errors})
+    applied = apply_rows(cur, req.data)
+    conn.commit()
+    return {'success': True, 'applied': applied}
+
+@traced('players')
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    return router.dispatch(event, context)
+
+router.startup()
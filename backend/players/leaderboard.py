@@ -0,0 +1,104 @@
+'''
+Business: Материализованная таблица бомбардиров с очками, местом в дивизионе и top-N выборкой
+Args: cur - курсор БД, division - дивизион или None для общего зачета, sort/limit/offset, season_id - архивный сезон
+Returns: строки таблицы бомбардиров, уже отсортированные и с рангом
+'''
+from typing import Any, Dict, List, Optional, Tuple
+
+TOTAL_DIVISION = 'ALL'
+MAX_PAGE_SIZE = 500
+
+SORT_ORDERS = {
+    'goals': 'goals DESC, assists DESC',
+    'assists': 'assists DESC, goals DESC',
+    'points': 'points DESC, goals DESC'
+}
+
+def refresh_players(cur, player_ids: List[int]) -> None:
+    cur.execute('''
+        INSERT INTO player_leaderboard (player_id, division, goals, assists, games_played)
+        SELECT player_id, division, COALESCE(goals, 0), COALESCE(assists, 0), COALESCE(games_played, 0)
+        FROM player_stats WHERE player_id = ANY(%s::int[])
+        ON CONFLICT (division, player_id) DO UPDATE SET
+            goals = EXCLUDED.goals, assists = EXCLUDED.assists,
+            games_played = EXCLUDED.games_played, updated_at = CURRENT_TIMESTAMP
+    ''', (player_ids,))
+    cur.execute('''
+        INSERT INTO player_leaderboard (player_id, division, goals, assists, games_played)
+        SELECT ids.player_id, %s, COALESCE(SUM(ps.goals), 0), COALESCE(SUM(ps.assists), 0), COALESCE(SUM(ps.games_played), 0)
+        FROM unnest(%s::int[]) AS ids(player_id)
+        LEFT JOIN player_stats ps ON ps.player_id = ids.player_id
+        GROUP BY ids.player_id
+        ON CONFLICT (division, player_id) DO UPDATE SET
+            goals = EXCLUDED.goals, assists = EXCLUDED.assists,
+            games_played = EXCLUDED.games_played, updated_at = CURRENT_TIMESTAMP
+    ''', (TOTAL_DIVISION, player_ids))
+
+def refresh_player(cur, player_id: int) -> None:
+    refresh_players(cur, [int(player_id)])
+
+def parse_page(params: dict) -> Tuple[str, Optional[int], int]:
+    # sort, limit и offset уже приведены схемой PLAYERS_QUERY
+    sort, limit, offset = params['sort'], params.get('limit'), params['offset']
+    if limit is not None:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return sort, limit, max(0, offset)
+
+def _season_leaderboard_sql(order: str, division_column: str) -> str:
+    # Снимок сезона хранит игрока и команду на момент архивации
+    return f'''
+        SELECT
+            s.player_id as id, s.nickname, s.jersey_number, s.position,
+            s.team_name, t.logo_url as team_logo,
+            s.goals, s.assists, s.games_played, s.points,
+            RANK() OVER (ORDER BY {order}) as rank{division_column}
+        FROM season_player_stats s
+        LEFT JOIN teams t ON t.id = s.team_id
+        WHERE s.season_id = %s AND s.division = %s
+        ORDER BY {order}, s.player_id
+        LIMIT %s OFFSET %s
+    '''
+
+def _leaderboard_sql(order: str, division_column: str) -> str:
+    return f'''
+        SELECT
+            p.id, p.nickname, p.jersey_number, p.position,
+            t.name as team_name, t.logo_url as team_logo,
+            lb.goals, lb.assists, lb.games_played, lb.points, lb.rank{division_column}
+        FROM (
+            SELECT player_id, goals, assists, games_played, points,
+                   RANK() OVER (ORDER BY {order}) as rank
+            FROM player_leaderboard
+            WHERE division = %s
+            ORDER BY {order}, player_id
+            LIMIT %s OFFSET %s
+        ) lb
+        JOIN players p ON p.id = lb.player_id
+        JOIN teams t ON p.team_id = t.id
+        ORDER BY lb.rank, lb.player_id
+    '''
+
+# Все варианты (сортировка x с дивизионом или без) собираются один раз при импорте
+LEADERBOARD_SQL = {(sort, by_division): _leaderboard_sql(order, ', %s as division' if by_division else '')
+                   for sort, order in SORT_ORDERS.items() for by_division in (False, True)}
+SEASON_LEADERBOARD_SQL = {(sort, by_division): _season_leaderboard_sql(order, ', %s as division' if by_division else '')
+                          for sort, order in SORT_ORDERS.items() for by_division in (False, True)}
+
+def season_leaderboard_query(season_id: int, division: Optional[str], sort: str, limit: Optional[int], offset: int) -> Tuple[str, List[Any]]:
+    params: List[Any] = [division] if division else []
+    params.extend([season_id, division or TOTAL_DIVISION, limit, offset])
+    return SEASON_LEADERBOARD_SQL[(sort, bool(division))], params
+
+def leaderboard_query(division: Optional[str], sort: str, limit: Optional[int], offset: int,
+                      season_id: Optional[int] = None) -> Tuple[str, List[Any]]:
+    if season_id is not None:
+        return season_leaderboard_query(season_id, division, sort, limit, offset)
+    params: List[Any] = [division] if division else []
+    params.extend([division or TOTAL_DIVISION, limit, offset])
+    return LEADERBOARD_SQL[(sort, bool(division))], params
+
+def fetch_leaderboard(cur, division: Optional[str], sort: str, limit: Optional[int], offset: int,
+                      season_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    cur.execute(*leaderboard_query(division, sort, limit, offset, season_id))
+    columns = [column.name for column in cur.description]
+    return [dict(zip(columns, row)) for row in cur.fetchall()]
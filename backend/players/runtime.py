@@ -0,0 +1,236 @@
+'''
+Business: Общий runtime функций - таблица маршрутов (method, path) с заявленной потребностью в БД
+Args: Router(function, allow_headers), маршруты регистрируются декоратором router.route(...) со схемами query/body,
+      router.startup() в конце index.py готовит все до первого вызова (DB_WARMUP=1 - и пул соединений)
+Returns: HTTP response dict; невалидный запрос получает 400 до соединения, маршруты без БД не открывают соединение, read-only идут на DATABASE_READ_URL,
+         записи возвращают X-Read-After, с которым следующие чтения не отстают от реплики;
+         крупные ответы сжимаются по Accept-Encoding, сжатые варианты лежат в кэше рядом с телом
+'''
+import base64
+import json
+from typing import Any, Callable, Dict, NamedTuple, Optional, Set, Tuple
+from cache import response_cache
+from compress import compress_body, negotiate
+from db import DB_WARMUP, PoolExhausted, connection, parse_token, warm_up, write_token
+from fastjson import dumps, fast_mode
+from instrument import phase, record_error, record_rejection
+from schema import Schema, ValidationError
+from sqljson import RawJSON
+from versions import ResourceVersion, fetch_version, is_not_modified, not_modified_response
+
+NO_DB = 'none'
+READ_ONLY = 'read'
+READ_WRITE = 'write'
+READ_AFTER_HEADER = 'X-Read-After'
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str, payload: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.status = status
+        self.payload = payload if payload is not None else {'error': message}
+
+class HttpResponse(dict):
+    pass
+
+def response(status: int = 200, body: str = '', headers: Optional[Dict[str, str]] = None,
+             base64_encoded: bool = False) -> HttpResponse:
+    return HttpResponse(statusCode=status, headers=headers or {}, isBase64Encoded=base64_encoded, body=body)
+
+def json_response(body: str, status: int = 200, headers: Optional[Dict[str, str]] = None,
+                  base64_encoded: bool = False) -> HttpResponse:
+    all_headers = {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'}
+    all_headers.update(headers or {})
+    return response(status, body, all_headers, base64_encoded)
+
+class Request:
+    def __init__(self, event: Dict[str, Any], context: Any):
+        self.event = event
+        self.context = context
+        self.method: str = event.get('httpMethod', 'GET')
+        self.params: Dict[str, Any] = event.get('queryStringParameters') or {}
+        self.path: str = self.params.get('path', '')
+        self.query: Dict[str, Any] = self.params
+        self.headers = {key.lower(): value for key, value in (event.get('headers') or {}).items()}
+        self.data: Any = None
+        self._json: Any = None
+
+    @property
+    def body(self) -> str:
+        raw = self.event.get('body') or ''
+        if self.event.get('isBase64Encoded'):
+            raw = base64.b64decode(raw).decode('utf-8')
+        return raw
+
+    def json(self) -> Any:
+        if self._json is None:
+            try:
+                self._json = json.loads(self.body or '{}')
+            except ValueError:
+                raise HttpError(400, 'Invalid JSON body')
+        return self._json
+
+class Route(NamedTuple):
+    method: str
+    path: str
+    fn: Callable
+    db: str
+    resources: Tuple[str, ...]
+    invalidates: Tuple[str, ...]
+    status: int
+    prepare: Optional[Callable]
+    query: Optional[Schema]
+    body: Optional[Schema]
+    name: str
+
+class Router:
+    def __init__(self, function: str, allow_headers: str = 'Content-Type'):
+        self.function = function
+        self.allow_headers = allow_headers
+        self.routes: Dict[Tuple[str, str], Route] = {}
+        self.paths: Set[str] = set()
+        self.rejections: Dict[str, int] = {}
+        self._preflight_headers: Optional[Dict[str, str]] = None
+
+    def route(self, method: str, path: str = '', db: str = READ_WRITE, resources: Tuple[str, ...] = (),
+              invalidates: Tuple[str, ...] = (), status: int = 200, prepare: Optional[Callable] = None,
+              query: Optional[Schema] = None, body: Optional[Schema] = None) -> Callable:
+        def register(fn: Callable) -> Callable:
+            self.routes[(method, path)] = Route(method, path, fn, db, tuple(resources), tuple(invalidates),
+                                                status, prepare, query, body, self.cache_name(path))
+            self.paths.add(path)
+            self._preflight_headers = None
+            return fn
+        return register
+
+    def cache_name(self, path: str) -> str:
+        return path or self.function
+
+    def startup(self) -> None:
+        # Вызывается в конце импорта index.py: все, что не зависит от запроса, готово до первого вызова
+        self.preflight()
+        if DB_WARMUP:
+            warm_up({route.db == READ_ONLY for route in self.routes.values() if route.db != NO_DB})
+
+    def preflight(self) -> Dict[str, Any]:
+        if self._preflight_headers is None:
+            methods = sorted({method for method, _ in self.routes} | {'OPTIONS'})
+            self._preflight_headers = {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': ', '.join(methods),
+                'Access-Control-Allow-Headers': f'{self.allow_headers}, {READ_AFTER_HEADER}',
+                'Access-Control-Max-Age': '86400'
+            }
+        return {'statusCode': 200, 'headers': dict(self._preflight_headers), 'body': ''}
+
+    def dispatch(self, event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        request = Request(event, context)
+        if request.method == 'OPTIONS':
+            return self.preflight()
+
+        route = self.routes.get((request.method, request.path))
+        if route is None:
+            if request.path in self.paths:
+                return json_response(json.dumps({'error': 'Method not allowed'}), 405)
+            return json_response(json.dumps({'error': 'Unknown path'}), 404)
+
+        try:
+            return self._run(route, request)
+        except ValidationError as e:
+            return json_response(json.dumps({'error': str(e), 'fields': e.errors}, ensure_ascii=False), 400)
+        except HttpError as e:
+            return json_response(dumps(e.payload), e.status)
+        except ValueError as e:
+            return json_response(json.dumps({'error': str(e)}, ensure_ascii=False), 400)
+        except PoolExhausted as e:
+            # Всплеск сверх DB_POOL_MAX - временная перегрузка, а не ошибка сервера
+            record_error(e)
+            return json_response(json.dumps({'error': str(e)}), 503, {'Retry-After': '1'})
+        except Exception as e:
+            record_error(e)
+            return json_response(json.dumps({'error': str(e)}, ensure_ascii=False), 500)
+
+    def _validate(self, route: Route, request: Request) -> str:
+        try:
+            json_mode = fast_mode(request.params)
+            if route.query:
+                request.query = route.query.validate(request.params)
+            if route.body:
+                request.data = route.body.validate(request.json())
+            if route.prepare:
+                request.data = route.prepare(request)
+            return json_mode
+        except (HttpError, ValueError) as e:
+            # Отказ до соединения с БД: считаем, сколько запросов отсеяно без лишней работы
+            if not isinstance(e, HttpError) or e.status == 400:
+                name = f'{route.method} {route.name}'
+                self.rejections[name] = self.rejections.get(name, 0) + 1
+                record_rejection(getattr(e, 'errors', None) or str(e))
+            raise
+
+    def _run(self, route: Route, request: Request) -> Dict[str, Any]:
+        json_mode = self._validate(route, request)
+
+        read_after = request.headers.get(READ_AFTER_HEADER.lower())
+        encoding = negotiate(request.headers.get('accept-encoding'))
+        cache_key = response_cache.key(route.name, request.params) if route.resources else None
+        if cache_key and not parse_token(read_after):
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                body, version, variants = cached
+                if is_not_modified(request.event, version):
+                    return not_modified_response(version)
+                return self._respond(route, body, 'HIT', version, encoding=encoding, variants=variants)
+
+        version: Optional[ResourceVersion] = None
+        token: Optional[str] = None
+        if route.db == NO_DB:
+            result = route.fn(request)
+        else:
+            with connection(readonly=route.db == READ_ONLY, read_after=read_after) as conn:
+                if route.resources:
+                    version = fetch_version(conn, cache_key, route.resources)
+                    if is_not_modified(request.event, version):
+                        return not_modified_response(version)
+                result = route.fn(request, conn)
+                if route.db == READ_WRITE:
+                    token = write_token(conn)
+
+        if route.invalidates:
+            response_cache.invalidate(*route.invalidates)
+        if isinstance(result, HttpResponse):
+            return result
+        extra = {READ_AFTER_HEADER: token, 'Access-Control-Expose-Headers': READ_AFTER_HEADER} if token else {}
+
+        with phase('serialize'):
+            body = result if isinstance(result, RawJSON) else dumps(result, json_mode)
+        if cache_key:
+            variants: Dict[str, Optional[str]] = {}
+            response_cache.set(cache_key, (body, version, variants))
+            return self._respond(route, body, 'MISS', version, encoding=encoding, variants=variants)
+        return self._respond(route, body, headers=extra, encoding=encoding)
+
+    def _respond(self, route: Route, body: str, cache_status: Optional[str] = None,
+                 version: Optional[ResourceVersion] = None, headers: Optional[Dict[str, str]] = None,
+                 encoding: Optional[str] = None, variants: Optional[Dict[str, Optional[str]]] = None) -> HttpResponse:
+        headers = dict(headers or {}, Vary='Accept-Encoding')
+        if cache_status:
+            headers['X-Cache'] = cache_status
+        if version:
+            headers.update(version.headers())
+        if encoding is None:
+            return json_response(body, route.status, headers)
+
+        # Сжатие один раз на запись кэша и кодирование; None - ответ меньше порога
+        if variants is not None and encoding in variants:
+            compressed = variants[encoding]
+        else:
+            with phase('compress'):
+                compressed = compress_body(body, encoding)
+            if variants is not None:
+                variants[encoding] = compressed
+        if compressed is None:
+            return json_response(body, route.status, headers)
+        headers['Content-Encoding'] = encoding
+        if 'ETag' in headers:
+            headers['ETag'] = 'W/' + headers['ETag']
+        return json_response(compressed, route.status, headers, base64_encoded=True)
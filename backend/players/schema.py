@@ -0,0 +1,88 @@
+'''
+Business: Декларативные схемы тела и параметров запроса - поля компилируются при импорте в кортеж проверок,
+          значения приводятся к типам (целые, даты, перечисления) до открытия соединения с БД
+Args: Schema(name=Field(integer(1), required=True), ...), Router.route(..., query=schema, body=schema)
+Returns: словарь приведенных значений только с объявленными полями; ошибки - ValidationError с полями
+'''
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Mapping, NamedTuple, Optional, Tuple
+
+Coerce = Callable[[Any], Any]
+
+class ValidationError(ValueError):
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__('; '.join(errors.values()))
+        self.errors = errors
+
+class Field(NamedTuple):
+    coerce: Coerce
+    required: bool = False
+    default: Any = None
+
+def integer(minimum: Optional[int] = None, maximum: Optional[int] = None) -> Coerce:
+    def coerce(value: Any) -> int:
+        if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+            raise ValueError
+        number = int(value)
+        if minimum is not None and number < minimum or maximum is not None and number > maximum:
+            raise ValueError
+        return number
+    return coerce
+
+def text(max_length: Optional[int] = None, strip: bool = True) -> Coerce:
+    def coerce(value: Any) -> str:
+        if not isinstance(value, str):
+            raise ValueError
+        value = value.strip() if strip else value
+        if max_length is not None and len(value) > max_length:
+            raise ValueError
+        return value
+    return coerce
+
+def one_of(values: Iterable[str]) -> Coerce:
+    allowed = frozenset(values)
+    def coerce(value: Any) -> str:
+        if value not in allowed:
+            raise ValueError
+        return value
+    return coerce
+
+def timestamp(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).strip())
+
+def day(value: Any) -> date:
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    return date.fromisoformat(str(value).strip())
+
+class Schema:
+    def __init__(self, **fields: Field):
+        # Поля разворачиваются в кортеж один раз при импорте модуля функции
+        self.fields: Tuple[Tuple[str, Coerce, bool, Any], ...] = tuple(
+            (name, field.coerce, field.required, field.default) for name, field in fields.items()
+        )
+
+    def validate(self, data: Any) -> Dict[str, Any]:
+        if not isinstance(data, Mapping):
+            raise ValidationError({'': 'Request body must be a JSON object'})
+        result: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for name, coerce, required, default in self.fields:
+            value = data.get(name)
+            if value is None or value == '':
+                if required:
+                    errors[name] = f'{name} required'
+                elif default is not None:
+                    result[name] = default
+                elif name in data:
+                    result[name] = None
+                continue
+            try:
+                result[name] = coerce(value)
+            except (TypeError, ValueError):
+                errors[name] = f'Invalid {name}'
+        if errors:
+            raise ValidationError(errors)
+        return result
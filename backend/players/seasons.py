@@ -0,0 +1,38 @@
+'''
+Business: Выбор сезона для чтения - по умолчанию текущий, season= принимает название ('2025/2026'), id или all
+Args: params - queryStringParameters, cur - курсор БД для проверки архивного сезона
+Returns: SQL-условие по season_id для секционированной таблицы matches или id архивного сезона
+'''
+from typing import Any, Dict, List, Optional, Tuple
+
+ALL_SEASONS = 'all'
+CURRENT_SEASON_SQL = '(SELECT id FROM seasons WHERE is_current)'
+SEASON_BY_NAME_SQL = '(SELECT id FROM seasons WHERE name = %s OR id::text = %s)'
+
+def season_param(params: Dict[str, Any]) -> Optional[str]:
+    season = (params.get('season') or '').strip()
+    return season or None
+
+def season_filter(params: Dict[str, Any], column: str = 'm.season_id') -> Tuple[Optional[str], List[Any]]:
+    # Скалярный подзапрос вычисляется до чтения секций, лишние сезоны отсекаются при выполнении
+    season = season_param(params)
+    if season is None:
+        return f'{column} = {CURRENT_SEASON_SQL}', []
+    if season == ALL_SEASONS:
+        return None, []
+    return f'{column} = {SEASON_BY_NAME_SQL}', [season, season]
+
+def archived_season(cur, params: Dict[str, Any]) -> Optional[int]:
+    season = season_param(params)
+    if season is None:
+        return None
+    cur.execute('SELECT id, is_current, archived_at IS NOT NULL FROM seasons WHERE name = %s OR id::text = %s', (season, season))
+    row = cur.fetchone()
+    if row is None:
+        raise LookupError(f'Season {season} not found')
+    season_id, is_current, archived = row.values() if isinstance(row, dict) else row
+    if is_current:
+        return None
+    if not archived:
+        raise LookupError(f'Season {season} has no final standings yet')
+    return season_id
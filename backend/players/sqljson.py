@@ -0,0 +1,18 @@
+'''
+Business: Сборка JSON-ответов на стороне Postgres (json_agg / row_to_json)
+Args: cur - курсор БД, SQL-запрос (одна текстовая JSON-колонка или выборка для json_agg)
+Returns: RawJSON - готовое тело ответа без повторной сериализации в Python
+'''
+from typing import Any, Sequence
+
+class RawJSON(str):
+    pass
+
+def fetch_json(cur, query: str, params: Sequence[Any] = ()) -> RawJSON:
+    cur.execute(query, params)
+    row = cur.fetchone()
+    value = row[0] if isinstance(row, tuple) else next(iter(row.values()))
+    return RawJSON(value)
+
+def fetch_json_array(cur, query: str, params: Sequence[Any] = ()) -> RawJSON:
+    return fetch_json(cur, f"SELECT COALESCE(json_agg(q), '[]'::json)::text FROM ({query}) q", params)
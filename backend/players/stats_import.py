@@ -0,0 +1,96 @@
+'''
+Business: Пакетный импорт статистики игроков за матч одной транзакцией
+Args: body_data - {"rows": [{player_id, division, goals, assists, games_played}]} или {"csv": "..."}
+Returns: (валидные строки, ошибки по строкам) и число примененных строк
+'''
+import csv
+import io
+from typing import Any, Dict, List, Tuple
+from leaderboard import refresh_players
+
+DIVISIONS = ('ПХЛ', 'ВХЛ', 'ТХЛ')
+STAT_COLUMNS = ('goals', 'assists', 'games_played')
+MAX_ROWS = 1000
+
+def _rows_from_csv(text: str) -> List[Dict[str, Any]]:
+    reader = csv.DictReader(io.StringIO(text.strip()))
+    return [{(key or '').strip(): (value or '').strip() for key, value in row.items()} for row in reader]
+
+def parse_rows(body_data: Any) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    if not isinstance(body_data, dict):
+        return [], [{'row': None, 'error': 'Body must be an object with rows or csv'}]
+    if 'csv' in body_data:
+        text = body_data.get('csv') or ''
+        if not isinstance(text, str):
+            return [], [{'row': None, 'error': 'csv must be a string'}]
+        raw_rows = _rows_from_csv(text)
+    else:
+        raw_rows = body_data.get('rows')
+    if not isinstance(raw_rows, list) or not raw_rows:
+        return [], [{'row': None, 'error': 'rows or csv with at least one row required'}]
+    if len(raw_rows) > MAX_ROWS:
+        return [], [{'row': None, 'error': f'At most {MAX_ROWS} rows per import'}]
+
+    rows: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    seen = set()
+    for index, raw in enumerate(raw_rows):
+        if not isinstance(raw, dict):
+            errors.append({'row': index, 'error': 'Row must be an object'})
+            continue
+        row_errors = []
+        try:
+            player_id = int(raw.get('player_id'))
+            if player_id <= 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            row_errors.append('player_id must be a positive integer')
+            player_id = None
+        division = raw.get('division')
+        if division not in DIVISIONS:
+            row_errors.append('division must be one of: ' + ', '.join(DIVISIONS))
+        stats = {}
+        for column in STAT_COLUMNS:
+            value = raw.get(column)
+            try:
+                stats[column] = int(value) if value not in (None, '') else 0
+                if stats[column] < 0:
+                    raise ValueError
+            except (TypeError, ValueError):
+                row_errors.append(f'{column} must be a non-negative integer')
+        if player_id is not None and (player_id, division) in seen:
+            row_errors.append('Duplicate player_id and division in this import')
+        if row_errors:
+            errors.append({'row': index, 'error': '; '.join(row_errors)})
+            continue
+        seen.add((player_id, division))
+        rows.append({'row': index, 'player_id': player_id, 'division': division, **stats})
+    return rows, errors
+
+def missing_players(cur, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    player_ids = sorted({row['player_id'] for row in rows})
+    cur.execute('SELECT id FROM players WHERE id = ANY(%s)', (player_ids,))
+    existing = {record[0] for record in cur.fetchall()}
+    return [
+        {'row': row['row'], 'error': f"Player {row['player_id']} not found"}
+        for row in rows if row['player_id'] not in existing
+    ]
+
+def apply_rows(cur, rows: List[Dict[str, Any]]) -> int:
+    # psycopg2.extras нужен только импорту - не грузим его при холодном старте функции
+    from psycopg2.extras import execute_values
+
+    execute_values(
+        cur,
+        '''
+        INSERT INTO player_stats (player_id, division, goals, assists, games_played)
+        VALUES %s
+        ON CONFLICT (player_id, division)
+        DO UPDATE SET goals = EXCLUDED.goals, assists = EXCLUDED.assists,
+                      games_played = EXCLUDED.games_played, updated_at = CURRENT_TIMESTAMP
+        ''',
+        [(row['player_id'], row['division'], row['goals'], row['assists'], row['games_played']) for row in rows],
+        page_size=len(rows)
+    )
+    refresh_players(cur, sorted({row['player_id'] for row in rows}))
+    return len(rows)
@@ -0,0 +1,58 @@
+'''
+Business: Сжатие JSON-ответов по Accept-Encoding - brotli (если установлен) или gzip, тело в base64 для шлюза функций
+Args: accept_encoding - заголовок запроса, body - JSON-строка; порог COMPRESS_MIN_BYTES, уровни COMPRESS_GZIP_LEVEL/COMPRESS_BROTLI_QUALITY
+Returns: выбранное кодирование и сжатое тело в base64 или None, если ответ меньше порога
+'''
+import base64
+import gzip
+import os
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', '5'))
+
+# При равном q выигрывает первое: brotli заметно меньше gzip на JSON с повторяющимися ключами
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def _weights(accept_encoding: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        weight = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if name.strip():
+            weights[name.strip().lower()] = weight
+    return weights
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    if not accept_encoding:
+        return None
+    weights = _weights(accept_encoding)
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+def compress_body(body: str, encoding: str) -> Optional[str]:
+    data = body.encode('utf-8')
+    if len(data) < COMPRESS_MIN_BYTES:
+        return None
+    if encoding == 'br':
+        data = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        data = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return base64.b64encode(data).decode('ascii')
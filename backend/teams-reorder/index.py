@@ -1,60 +1,30 @@
 '''
 Business: Изменение порядка команд в турнирной таблице
-Args: event - dict с httpMethod, body (team_id и new_position)
+Args: event - dict с httpMethod, body ({division, team_ids} или {team_id, new_position})
 Returns: HTTP response dict
 '''
-import json
-import os
-import psycopg2
+from instrument import traced
+from reorder import ReorderConflict, parse_reorder, reorder
+from runtime import HttpError, Request, Router
 from typing import Dict, Any
 
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    method: str = event.get('httpMethod', 'GET')
-    
-    if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-Admin-Token',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': ''
-        }
-    
-    if method != 'POST':
-        return {
-            'statusCode': 405,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Method not allowed'})
-        }
-    
-    body_data = json.loads(event.get('body', '{}'))
-    team_id = body_data.get('team_id')
-    new_position = body_data.get('new_position')
-    
-    if not team_id or new_position is None:
-        return {
-            'statusCode': 400,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'team_id and new_position required'})
-        }
-    
-    dsn = os.environ.get('DATABASE_URL')
-    
-    conn = psycopg2.connect(dsn)
+router = Router('teams-reorder', 'Content-Type, X-Admin-Token')
+
+@router.route('POST', prepare=lambda req: parse_reorder(req.json()))
+def reorder_teams(req: Request, conn) -> Dict[str, Any]:
     cur = conn.cursor()
-    
-    cur.execute('UPDATE teams SET sort_order = %s WHERE id = %s', (new_position, team_id))
+    try:
+        result = reorder(cur, req.data)
+    except LookupError as e:
+        raise HttpError(404, str(e))
+    except ReorderConflict as e:
+        raise HttpError(409, str(e))
     conn.commit()
-    
     cur.close()
-    conn.close()
-    
-    return {
-        'statusCode': 200,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'isBase64Encoded': False,
-        'body': json.dumps({'success': True, 'message': 'Team position updated'})
-    }
+    return {'success': True, 'message': 'Team position updated', **result}
+
+@traced('teams-reorder')
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    return router.dispatch(event, context)
+
+router.startup()
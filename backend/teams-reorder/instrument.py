@@ -0,0 +1,207 @@
+'''
+Business: Трассировка запроса - фазы connect/db/serialize, отпечатки SQL, медленные запросы с EXPLAIN
+Args: handler функции оборачивается traced(name), курсоры psycopg2 - traced_cursor_factory()
+Returns: заголовок Server-Timing в ответе и одна структурированная строка лога на запрос
+'''
+import json
+import logging
+import os
+import re
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import psycopg2
+import psycopg2.extensions
+
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '200'))
+EXPLAIN_SLOW_QUERIES = os.environ.get('EXPLAIN_SLOW_QUERIES', '1') == '1'
+
+logger = logging.getLogger('phl.requests')
+if not logger.handlers:
+    _stream = logging.StreamHandler(sys.stdout)
+    _stream.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_stream)
+    logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    logger.propagate = False
+
+_FINGERPRINT_RULES = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%\(\w+\)s|%s'), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\s+'), ' '),
+    (re.compile(r'\((?:\s*\?\s*,)*\s*\?\s*\)'), '(?)'),
+    (re.compile(r'(?:\(\?\)\s*,\s*)+\(\?\)'), '(?), ...')
+]
+
+def fingerprint(query: Any) -> str:
+    text = query.decode('utf-8', 'replace') if isinstance(query, bytes) else str(query)
+    for pattern, replacement in _FINGERPRINT_RULES:
+        text = pattern.sub(replacement, text)
+    return text.strip()[:500]
+
+class RequestTrace:
+    def __init__(self, function: str, request_id: str):
+        self.function = function
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.queries: List[Dict[str, Any]] = []
+        self.slow_queries: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.rejected: Any = None
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds * 1000
+
+    def record_query(self, query: Any, seconds: float, rows: int) -> Dict[str, Any]:
+        entry = {'sql': fingerprint(query), 'ms': round(seconds * 1000, 3), 'rows': rows}
+        self.queries.append(entry)
+        self.add_phase('db', seconds)
+        return entry
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        parts = [f'{name};dur={ms:.2f}' for name, ms in self.phases.items()]
+        parts.append(f'total;dur={self.total_ms():.2f}')
+        return ', '.join(parts)
+
+_current: ContextVar[Optional[RequestTrace]] = ContextVar('phl_request_trace', default=None)
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current.get()
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace = _current.get()
+        if trace is not None:
+            trace.add_phase(name, time.perf_counter() - started)
+
+def record_rejection(reason: Any) -> None:
+    trace = _current.get()
+    if trace is not None:
+        trace.rejected = reason
+
+def record_error(error: BaseException) -> None:
+    trace = _current.get()
+    if trace is not None:
+        trace.error = ''.join(traceback.format_exception(type(error), error, error.__traceback__))
+
+def _explain(conn, query: Any, params: Any) -> Optional[str]:
+    if not EXPLAIN_SLOW_QUERIES or conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+        return None
+    text = query.decode('utf-8', 'replace') if isinstance(query, bytes) else str(query)
+    if not text.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    # EXPLAIN идет в транзакции запроса: под savepoint его ошибка не обрывает транзакцию вместе с записями
+    savepoint = conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+    try:
+        with psycopg2.extensions.cursor(conn) as cur:
+            if savepoint:
+                cur.execute('SAVEPOINT phl_explain')
+            try:
+                cur.execute('EXPLAIN ' + text, params)
+                plan = '\n'.join(row[0] for row in cur.fetchall())
+            except psycopg2.Error as e:
+                if savepoint:
+                    cur.execute('ROLLBACK TO SAVEPOINT phl_explain')
+                return f'EXPLAIN failed: {e}'
+            if savepoint:
+                cur.execute('RELEASE SAVEPOINT phl_explain')
+            return plan
+    except psycopg2.Error as e:
+        return f'EXPLAIN failed: {e}'
+
+def _traced_execute(cursor, execute: Callable, query: Any, params: Any) -> Any:
+    trace = _current.get()
+    if trace is None:
+        return execute(query, params)
+    started = time.perf_counter()
+    try:
+        return execute(query, params)
+    finally:
+        seconds = time.perf_counter() - started
+        entry = trace.record_query(query, seconds, cursor.rowcount)
+        if seconds * 1000 >= SLOW_QUERY_MS:
+            slow = dict(entry, statement=str(query if not isinstance(query, bytes) else query.decode('utf-8', 'replace')))
+            slow['plan'] = _explain(cursor.connection, query, params)
+            trace.slow_queries.append(slow)
+
+_traced_factories: Dict[type, type] = {}
+
+def traced_cursor_factory(base: type) -> type:
+    factory = _traced_factories.get(base)
+    if factory is None:
+        class TracedCursor(base):
+            def execute(self, query, vars=None):
+                return _traced_execute(self, super().execute, query, vars)
+
+            def executemany(self, query, vars_list):
+                return _traced_execute(self, super().executemany, query, vars_list)
+
+        TracedCursor.__name__ = f'Traced{base.__name__}'
+        factory = _traced_factories[base] = TracedCursor
+    return factory
+
+def _request_id(context: Any) -> str:
+    return getattr(context, 'request_id', None) or os.urandom(16).hex()
+
+def _log(trace: RequestTrace, event: Dict[str, Any], status: int) -> None:
+    params = event.get('queryStringParameters') or {}
+    line = {
+        'event': 'request',
+        'function': trace.function,
+        'request_id': trace.request_id,
+        'method': event.get('httpMethod', 'GET'),
+        'path': params.get('path', ''),
+        'status': status,
+        'duration_ms': round(trace.total_ms(), 2),
+        'phases_ms': {name: round(ms, 2) for name, ms in trace.phases.items()},
+        'queries': len(trace.queries),
+        'query_log': trace.queries
+    }
+    if trace.slow_queries:
+        line['slow_queries'] = trace.slow_queries
+    if trace.error:
+        line['error'] = trace.error
+    if trace.rejected is not None:
+        line['rejected'] = trace.rejected
+    level = logging.ERROR if status >= 500 else logging.WARNING if trace.slow_queries else logging.INFO
+    logger.log(level, json.dumps(line, ensure_ascii=False, default=str))
+
+def traced(function: str) -> Callable:
+    def decorator(handler: Callable) -> Callable:
+        @wraps(handler)
+        def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+            trace = RequestTrace(function, _request_id(context))
+            token = _current.set(trace)
+            try:
+                try:
+                    response = handler(event, context)
+                except Exception as e:
+                    record_error(e)
+                    response = {
+                        'statusCode': 500,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'isBase64Encoded': False,
+                        'body': json.dumps({'error': str(e), 'request_id': trace.request_id}, ensure_ascii=False)
+                    }
+                headers = response.setdefault('headers', {})
+                headers['Server-Timing'] = trace.server_timing()
+                headers['Timing-Allow-Origin'] = '*'
+                headers['X-Request-Id'] = trace.request_id
+                _log(trace, event, response.get('statusCode', 200))
+                return response
+            finally:
+                _current.reset(token)
+        return wrapper
+    return decorator
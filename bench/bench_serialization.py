@@ -0,0 +1,118 @@
+'''
+Business: Бенчмарк сериализации списка матчей - json.dumps(default=str) против orjson и json_agg в Postgres
+Args: --matches N (по умолчанию 10000), --repeat R; BENCH_DATABASE_URL включает замер SQL-пути
+Returns: таблица среднего времени и ускорения по каждому способу
+'''
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'api'))
+
+from fastjson import HAS_ORJSON, dumps  # noqa: E402
+
+STATUSES = ['Не начался', 'Матч идет', 'Конец матча', 'Конец матча (ОТ)', 'Конец матча (Б)']
+
+def synthetic_matches(count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(42)
+    start = datetime(2020, 9, 1, 19, 0)
+    rows = []
+    for match_id in range(1, count + 1):
+        home, away = rng.sample(range(1, 31), 2)
+        rows.append({
+            'id': match_id,
+            'match_date': start + timedelta(hours=6 * match_id),
+            'home_team_id': home,
+            'away_team_id': away,
+            'home_score': rng.randint(0, 7),
+            'away_score': rng.randint(0, 7),
+            'status': rng.choice(STATUSES),
+            'created_at': start + timedelta(hours=6 * match_id - 48),
+            'home_team_name': f'Команда {home}',
+            'away_team_name': f'Команда {away}'
+        })
+    return rows
+
+def timeit(fn: Callable[[], Any], repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+def python_results(rows: List[Dict[str, Any]], repeat: int) -> Dict[str, float]:
+    results = {'dict + json.dumps(default=str)': timeit(lambda: json.dumps([dict(r) for r in rows], ensure_ascii=False, default=str), repeat)}
+    if HAS_ORJSON:
+        results['dict + orjson'] = timeit(lambda: dumps([dict(r) for r in rows], 'orjson'), repeat)
+    return results
+
+def sql_results(dsn: str, count: int, repeat: int) -> Dict[str, float]:
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+
+    conn = psycopg2.connect(dsn)
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute('''
+        CREATE TEMP TABLE bench_teams AS
+        SELECT g as id, 'Команда ' || g as name FROM generate_series(1, 30) g;
+        CREATE TEMP TABLE bench_matches AS
+        SELECT g as id, TIMESTAMP '2020-09-01 19:00' + g * INTERVAL '6 hours' as match_date,
+               1 + g %% 30 as home_team_id, 1 + (g + 7) %% 30 as away_team_id,
+               g %% 7 as home_score, (g * 3) %% 7 as away_score,
+               'Конец матча'::varchar as status, now()::timestamp as created_at
+        FROM generate_series(1, %s) g;
+    ''', (count,))
+    query = '''
+        SELECT m.*, ht.name as home_team_name, at.name as away_team_name
+        FROM bench_matches m
+        LEFT JOIN bench_teams ht ON m.home_team_id = ht.id
+        LEFT JOIN bench_teams at ON m.away_team_id = at.id
+        ORDER BY m.match_date DESC, m.id DESC
+    '''
+
+    def baseline():
+        cur.execute(query)
+        return json.dumps([dict(row) for row in cur.fetchall()], ensure_ascii=False, default=str)
+
+    def server_side():
+        cur.execute(f"SELECT COALESCE(json_agg(q), '[]'::json)::text as body FROM ({query}) q")
+        return cur.fetchone()['body']
+
+    results = {
+        'postgres rows + json.dumps(default=str)': timeit(baseline, repeat),
+        'postgres json_agg (fast=sql)': timeit(server_side, repeat)
+    }
+    if HAS_ORJSON:
+        def orjson_path():
+            cur.execute(query)
+            return dumps([dict(row) for row in cur.fetchall()], 'orjson')
+        results['postgres rows + orjson (fast=orjson)'] = timeit(orjson_path, repeat)
+    conn.close()
+    return results
+
+def report(title: str, results: Dict[str, float]) -> None:
+    baseline = next(iter(results.values()))
+    print(title)
+    for name, seconds in results.items():
+        print(f'  {name:<42} {seconds * 1000:9.2f} ms   x{baseline / seconds:5.2f}')
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--matches', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    report(f'In-process serialization, {args.matches} matches', python_results(synthetic_matches(args.matches), args.repeat))
+    dsn = os.environ.get('BENCH_DATABASE_URL')
+    if dsn:
+        report(f'End-to-end query + serialization, {args.matches} matches', sql_results(dsn, args.matches, args.repeat))
+    else:
+        print('BENCH_DATABASE_URL not set, skipping the Postgres json_agg comparison')
+
+if __name__ == '__main__':
+    main()
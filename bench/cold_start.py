@@ -0,0 +1,130 @@
+'''
+Business: Холодный и теплый вызов трех функций backend/ - каждый холодный старт в новом процессе Python
+Args: BENCH_DATABASE_URL (пустая БД, схема пересоздается), --cold N процессов на функцию, --warm M вызовов после первого,
+      --gap-ms пауза между импортом и первым вызовом; каждая функция меряется без прогрева пула и с DB_WARMUP=1
+Returns: медианы запуска интерпретатора, импорта index, первого вызова и холодного старта целиком, p50/p95 теплого вызова
+'''
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from loadtest import BACKEND, load_function, percentile, reset_schema, seed
+
+FUNCTIONS = ('api', 'players', 'teams-reorder')
+
+def _event(function: str, team_id: int) -> Dict[str, Any]:
+    # Типичный первый запрос после деплоя: главная страница, топ бомбардиров, перестановка команды
+    if function == 'api':
+        return {'httpMethod': 'GET', 'queryStringParameters': {'path': 'homepage'}, 'headers': {}}
+    if function == 'players':
+        return {'httpMethod': 'GET', 'queryStringParameters': {'sort': 'points', 'limit': '10'}, 'headers': {}}
+    return {'httpMethod': 'POST', 'queryStringParameters': {}, 'headers': {},
+            'body': json.dumps({'team_id': team_id, 'new_position': 1})}
+
+def child(function: str, warm: int, gap_ms: float, team_id: int) -> None:
+    booted = time.time()
+    sys.path.insert(0, os.path.join(BACKEND, function))
+    started = time.perf_counter()
+    import index
+    imported = time.perf_counter()
+    if gap_ms:
+        time.sleep(gap_ms / 1000)
+
+    event = _event(function, team_id)
+    timings = []
+    for _ in range(warm + 1):
+        call_started = time.perf_counter()
+        response = index.handler(event, None)
+        timings.append((time.perf_counter() - call_started) * 1000)
+        if response['statusCode'] >= 400:
+            raise SystemExit(f"{function}: HTTP {response['statusCode']} {response['body']}")
+    print(json.dumps({
+        'boot_ms': (booted - float(os.environ['BENCH_SPAWNED_AT'])) * 1000,
+        'import_ms': (imported - started) * 1000,
+        'first_ms': timings[0],
+        'warm_ms': timings[1:]
+    }))
+
+def measure(function: str, db_warmup: bool, args: argparse.Namespace, team_id: int) -> Dict[str, Any]:
+    env = dict(os.environ, DB_WARMUP='1' if db_warmup else '0')
+    runs = []
+    for _ in range(args.cold):
+        env['BENCH_SPAWNED_AT'] = repr(time.time())
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', function, '--warm', str(args.warm),
+             '--gap-ms', str(args.gap_ms), '--team-id', str(team_id)],
+            env=env, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip() or completed.stdout.strip())
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    median = lambda key: statistics.median(run[key] for run in runs)
+    warm = [value for run in runs for value in run['warm_ms']]
+    return {
+        'name': function + (' DB_WARMUP=1' if db_warmup else ''),
+        'boot_ms': median('boot_ms'),
+        'import_ms': median('import_ms'),
+        'first_ms': median('first_ms'),
+        'cold_ms': statistics.median(run['boot_ms'] + run['import_ms'] + run['first_ms'] for run in runs),
+        'warm_p50_ms': percentile(warm, 50),
+        'warm_p95_ms': percentile(warm, 95)
+    }
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print(f"{'function':<26} {'boot':>8} {'import':>8} {'first':>8} {'cold':>8} {'warm p50':>9} {'warm p95':>9} {'cold/warm':>9}")
+    for row in results:
+        print(f"{row['name']:<26} {row['boot_ms']:>8.1f} {row['import_ms']:>8.1f} {row['first_ms']:>8.1f} "
+              f"{row['cold_ms']:>8.1f} {row['warm_p50_ms']:>9.2f} {row['warm_p95_ms']:>9.2f} "
+              f"{row['first_ms'] / row['warm_p50_ms']:>8.1f}x")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Measure cold-start versus warm invocation latency of the backend handlers')
+    parser.add_argument('--cold', type=int, default=10, help='fresh processes per function')
+    parser.add_argument('--warm', type=int, default=20, help='warm invocations after the first one in each process')
+    parser.add_argument('--gap-ms', type=float, default=0, help='pause between import and the first invocation')
+    parser.add_argument('--only', choices=FUNCTIONS)
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--child', choices=FUNCTIONS, help=argparse.SUPPRESS)
+    parser.add_argument('--team-id', type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child, args.warm, args.gap_ms, args.team_id)
+        return 0
+
+    dsn = os.environ.get('BENCH_DATABASE_URL')
+    if not dsn:
+        print('BENCH_DATABASE_URL must point at a disposable Postgres database', file=sys.stderr)
+        return 2
+    os.environ['DATABASE_URL'] = dsn
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    # Без кэша ответов теплый вызов идет в БД так же, как первый
+    os.environ['CACHE_TTL_SECONDS'] = '0'
+
+    reset_schema(dsn)
+    ids = seed(dsn, load_function('api'), 10, 3, 300, 20, random.Random(1))
+
+    results = []
+    for function in FUNCTIONS:
+        if args.only and args.only != function:
+            continue
+        for db_warmup in (False, True):
+            results.append(measure(function, db_warmup, args, ids['teams'][0]))
+
+    print(f'{args.cold} cold processes per function, {args.warm} warm invocations each, '
+          f'{args.gap_ms:g} ms between import and first invocation')
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+'''
+Business: Бенчмарк live-канала - N зрителей ждут ?path=live в одном процессе, админ меняет счет матча
+Args: BENCH_DATABASE_URL (пустая БД, схема пересоздается), --watchers, --updates
+Returns: задержка доставки p50/p95/max, число запросов к БД от зрителей и от эквивалентного поллинга списка матчей
+'''
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from loadtest import _counter, load_function, percentile, reset_schema
+
+def _get(handler, params: Dict[str, Any]) -> Dict[str, Any]:
+    response = handler({'httpMethod': 'GET', 'queryStringParameters': params, 'headers': {}}, None)
+    return json.loads(response['body'])
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Measure live match fan-out against a local Postgres')
+    parser.add_argument('--watchers', type=int, default=200)
+    parser.add_argument('--updates', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    dsn = os.environ.get('BENCH_DATABASE_URL')
+    if not dsn:
+        print('BENCH_DATABASE_URL must point at a disposable Postgres database', file=sys.stderr)
+        return 2
+    os.environ['DATABASE_URL'] = dsn
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ['CACHE_TTL_SECONDS'] = '0'
+
+    reset_schema(dsn)
+    handler = load_function('api')['index'].handler
+    write = lambda method, path, body: handler({'httpMethod': method, 'queryStringParameters': {'path': path},
+                                                 'body': json.dumps(body)}, None)
+    write('POST', 'teams', {'name': 'Home', 'division': 'ПХЛ'})
+    write('POST', 'teams', {'name': 'Away', 'division': 'ПХЛ'})
+    teams = _get(handler, {'path': 'teams'})
+    home, away = sorted(team['id'] for team in teams)
+    match = {'match_date': '2026-01-01T18:00:00', 'home_team_id': home, 'away_team_id': away, 'status': 'Матч идет'}
+    write('POST', 'matches', match)
+    match['id'] = _get(handler, {'path': 'matches'})[0]['id']
+
+    published: Dict[int, float] = {}
+    latencies: List[float] = []
+    watcher_queries = [0]
+    lock = threading.Lock()
+    start_version = _get(handler, {'path': 'live'})['version']
+
+    def watch() -> None:
+        since, seen = start_version, 0
+        while seen < args.updates:
+            _counter.queries = 0
+            body = _get(handler, {'path': 'live', 'since': str(since), 'timeout': '5'})
+            received = time.perf_counter()
+            with lock:
+                watcher_queries[0] += _counter.queries
+                for event in body['events']:
+                    latencies.append((received - published.get(event['home_score'], received)) * 1000)
+            seen += len(body['events'])
+            since = body['version']
+
+    threads = [threading.Thread(target=watch, daemon=True) for _ in range(args.watchers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+
+    for score in range(1, args.updates + 1):
+        published[score] = time.perf_counter()
+        write('PUT', 'matches', dict(match, home_score=score, away_score=0))
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join(timeout=30)
+
+    _counter.queries = 0
+    _get(handler, {'path': 'matches'})
+    polling_queries = _counter.queries * args.watchers * args.updates
+
+    print(f'{args.watchers} watchers, {args.updates} score updates, {len(latencies)} deliveries')
+    print(f'delivery ms: p50 {percentile(latencies, 50):.2f}  p95 {percentile(latencies, 95):.2f}  max {max(latencies or [0]):.2f}')
+    print(f'db queries: live watchers {watcher_queries[0]}, equivalent polling of ?path=matches {polling_queries}')
+    return 0 if len(latencies) == args.watchers * args.updates else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,318 @@
+'''
+Business: Нагрузочный бенчмарк трех функций backend/ на локальном Postgres с синтетической лигой
+Args: BENCH_DATABASE_URL (пустая БД, схема пересоздается), --teams/--seasons/--matches/--players, --requests, --concurrency
+Returns: p50/p95/p99, пропускная способность и число запросов к БД по каждому сценарию; код 1 при превышении порогов
+'''
+import argparse
+import glob
+import importlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND = os.path.join(ROOT, 'backend')
+MIGRATIONS = os.path.join(ROOT, 'db_migrations')
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(__file__), 'thresholds.json')
+
+DIVISIONS = ('ПХЛ', 'ВХЛ', 'ТХЛ')
+FINAL_STATUSES = ('Конец матча', 'Конец матча (ОТ)', 'Конец матча (Б)')
+POSITIONS = ('Нападающий', 'Защитник', 'Вратарь')
+
+_counter = threading.local()
+
+class CountingCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, *args, **kwargs):
+        _counter.queries = getattr(_counter, 'queries', 0) + 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        _counter.queries = getattr(_counter, 'queries', 0) + 1
+        return self._cursor.executemany(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+class CountingConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return CountingCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+def load_function(name: str) -> Dict[str, Any]:
+    directory = os.path.join(BACKEND, name)
+    local_names = [os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(directory, '*.py'))]
+    for module_name in local_names:
+        sys.modules.pop(module_name, None)
+    sys.path.insert(0, directory)
+    try:
+        importlib.import_module('index')
+        modules = {module_name: sys.modules[module_name] for module_name in local_names if module_name in sys.modules}
+    finally:
+        sys.path.remove(directory)
+        for module_name in local_names:
+            sys.modules.pop(module_name, None)
+
+    original = modules['db'].connection
+
+    @contextmanager
+    def counted_connection(*args, **kwargs):
+        with original(*args, **kwargs) as conn:
+            yield CountingConnection(conn)
+
+    for module in modules.values():
+        if getattr(module, 'connection', None) is original:
+            module.connection = counted_connection
+    return modules
+
+def reset_schema(dsn: str) -> None:
+    import psycopg2
+
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute('DROP SCHEMA public CASCADE')
+        cur.execute('CREATE SCHEMA public')
+        for path in sorted(glob.glob(os.path.join(MIGRATIONS, 'V*.sql'))):
+            with open(path, encoding='utf-8') as f:
+                cur.execute(f.read())
+    conn.close()
+
+def seed(dsn: str, api: Dict[str, Any], teams: int, seasons: int, matches: int, players: int, rng: random.Random) -> Dict[str, Any]:
+    import psycopg2
+    from psycopg2.extras import execute_values
+
+    conn = psycopg2.connect(dsn)
+    cur = conn.cursor()
+    team_rows = [(f'Команда {division} {n}', division, n) for division in DIVISIONS for n in range(1, teams + 1)]
+    execute_values(cur, 'INSERT INTO teams (name, division, sort_order) VALUES %s', team_rows)
+    cur.execute('SELECT id, division FROM teams ORDER BY id')
+    by_division: Dict[str, List[int]] = {}
+    for team_id, division in cur.fetchall():
+        by_division.setdefault(division, []).append(team_id)
+
+    match_rows = []
+    start = datetime(2020, 9, 1, 19, 0)
+    for season in range(seasons):
+        season_start = start + timedelta(days=365 * season)
+        cur.execute('INSERT INTO seasons (name, starts_on) VALUES (%s, %s) RETURNING id',
+                    (f'{season_start.year}/{season_start.year + 1}', season_start.date()))
+        season_id = cur.fetchone()[0]
+        for n in range(matches):
+            division = DIVISIONS[n % len(DIVISIONS)]
+            home, away = rng.sample(by_division[division], 2)
+            match_rows.append((season_id, season_start + timedelta(hours=12 * n), home, away,
+                               rng.randint(0, 7), rng.randint(0, 7), rng.choice(FINAL_STATUSES)))
+    # Текущий - последний сгенерированный сезон, остальные лежат в своих секциях
+    cur.execute('UPDATE seasons SET is_current = FALSE WHERE is_current')
+    cur.execute('UPDATE seasons SET is_current = TRUE WHERE id = %s', (season_id,))
+    execute_values(cur, 'INSERT INTO matches (season_id, match_date, home_team_id, away_team_id, home_score, away_score, status) VALUES %s',
+                   match_rows, page_size=1000)
+
+    player_rows = [(team_id, f'Игрок {team_id}-{n}', n, rng.choice(POSITIONS))
+                   for ids in by_division.values() for team_id in ids for n in range(1, players + 1)]
+    execute_values(cur, 'INSERT INTO players (team_id, nickname, jersey_number, position) VALUES %s', player_rows, page_size=1000)
+    cur.execute('''
+        INSERT INTO player_stats (player_id, division, goals, assists, games_played)
+        SELECT p.id, t.division, (random() * 30)::int, (random() * 40)::int, (random() * 60)::int
+        FROM players p JOIN teams t ON t.id = p.team_id
+    ''')
+    cur.execute('''
+        INSERT INTO player_leaderboard (player_id, division, goals, assists, games_played)
+        SELECT player_id, division, goals, assists, games_played FROM player_stats
+        UNION ALL
+        SELECT player_id, 'ALL', SUM(goals), SUM(assists), SUM(games_played) FROM player_stats GROUP BY player_id
+    ''')
+    api['standings'].rebuild_team_stats(cur)
+
+    ids: Dict[str, Any] = {'teams': [team_id for team_ids in by_division.values() for team_id in team_ids]}
+    cur.execute('SELECT id FROM players ORDER BY id')
+    ids['players'] = [row[0] for row in cur.fetchall()]
+    cur.execute('SELECT id, home_team_id, away_team_id FROM matches ORDER BY id')
+    ids['match_teams'] = {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+    ids['matches'] = list(ids['match_teams'])
+    conn.commit()
+    conn.close()
+    return ids
+
+class Scenario(NamedTuple):
+    name: str
+    function: str
+    make_event: Callable[[random.Random, Dict[str, Any]], Dict[str, Any]]
+
+def _get(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {'httpMethod': 'GET', 'queryStringParameters': params, 'headers': {}}
+
+def _update_match(rng: random.Random, ids: Dict[str, Any]) -> Dict[str, Any]:
+    match_id = rng.choice(ids['matches'])
+    return {'httpMethod': 'PUT', 'queryStringParameters': {'path': 'matches'}, 'body': json.dumps({
+        'id': match_id, 'match_date': '2024-01-01T19:00:00',
+        'home_team_id': ids['match_teams'][match_id][0], 'away_team_id': ids['match_teams'][match_id][1],
+        'home_score': rng.randint(0, 7), 'away_score': rng.randint(0, 7), 'status': rng.choice(FINAL_STATUSES)
+    })}
+
+SCENARIOS = [
+    Scenario('api GET league-info', 'api', lambda rng, ids: _get({'path': 'league-info'})),
+    Scenario('api GET teams', 'api', lambda rng, ids: _get({'path': 'teams'})),
+    Scenario('api GET teams?division', 'api', lambda rng, ids: _get({'path': 'teams', 'division': rng.choice(DIVISIONS)})),
+    Scenario('api GET matches', 'api', lambda rng, ids: _get({'path': 'matches'})),
+    Scenario('api GET matches?limit=50', 'api', lambda rng, ids: _get({'path': 'matches', 'limit': '50'})),
+    Scenario('api GET matches?team_id', 'api', lambda rng, ids: _get({'path': 'matches', 'team_id': str(rng.choice(ids['teams'])), 'limit': '20'})),
+    Scenario('api GET champions', 'api', lambda rng, ids: _get({'path': 'champions'})),
+    Scenario('api GET homepage', 'api', lambda rng, ids: _get({'path': 'homepage'})),
+    Scenario('api PUT matches', 'api', _update_match),
+    Scenario('players GET', 'players', lambda rng, ids: _get({})),
+    Scenario('players GET top10', 'players', lambda rng, ids: _get({'sort': 'points', 'limit': '10'})),
+    Scenario('players GET division', 'players', lambda rng, ids: _get({'division': rng.choice(DIVISIONS)})),
+    Scenario('players PUT stats', 'players', lambda rng, ids: {'httpMethod': 'PUT', 'queryStringParameters': {}, 'body': json.dumps({
+        'player_id': rng.choice(ids['players']), 'division': rng.choice(DIVISIONS),
+        'goals': rng.randint(0, 30), 'assists': rng.randint(0, 40), 'games_played': rng.randint(0, 60)})}),
+    Scenario('teams-reorder POST', 'teams-reorder', lambda rng, ids: {'httpMethod': 'POST', 'queryStringParameters': {}, 'body': json.dumps({
+        'team_id': rng.choice(ids['teams']), 'new_position': rng.randint(1, 20)})})
+]
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def run_scenario(scenario: Scenario, handler: Callable, ids: Dict[str, Any], requests: int, concurrency: int, seed_value: int) -> Dict[str, Any]:
+    rng = random.Random(seed_value)
+    events = [scenario.make_event(rng, ids) for _ in range(requests)]
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def invoke(event: Dict[str, Any]) -> None:
+        nonlocal errors
+        _counter.queries = 0
+        started = time.perf_counter()
+        try:
+            status = handler(event, None)['statusCode']
+        except Exception:
+            status = 599
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            queries.append(_counter.queries)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(invoke, events))
+    wall = time.perf_counter() - started
+    return {
+        'scenario': scenario.name,
+        'requests': requests,
+        'errors': errors,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'rps': requests / wall if wall else 0.0,
+        'queries_per_request': sum(queries) / len(queries) if queries else 0.0
+    }
+
+def check_thresholds(results: List[Dict[str, Any]], thresholds: Dict[str, Dict[str, float]]) -> List[str]:
+    failures = []
+    for result in results:
+        limits = thresholds.get(result['scenario'], {})
+        for metric, limit in limits.items():
+            if metric == 'min_rps':
+                if result['rps'] < limit:
+                    failures.append(f"{result['scenario']}: rps {result['rps']:.1f} < {limit}")
+            elif result.get(metric, 0) > limit:
+                failures.append(f"{result['scenario']}: {metric} {result[metric]:.2f} > {limit}")
+        if result['errors']:
+            failures.append(f"{result['scenario']}: {result['errors']} failed request(s)")
+    return failures
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print(f"{'scenario':<28} {'req':>5} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rps':>8} {'q/req':>6}")
+    for r in results:
+        print(f"{r['scenario']:<28} {r['requests']:>5} {r['errors']:>4} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r['rps']:>8.1f} {r['queries_per_request']:>6.2f}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Load-test the backend handlers against a local Postgres')
+    parser.add_argument('--teams', type=int, default=10, help='teams per division')
+    parser.add_argument('--seasons', type=int, default=3)
+    parser.add_argument('--matches', type=int, default=300, help='matches per season')
+    parser.add_argument('--players', type=int, default=20, help='players per team')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--only', help='run scenarios whose name contains this text')
+    parser.add_argument('--with-cache', action='store_true', help='keep the in-process response cache enabled')
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS)
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    dsn = os.environ.get('BENCH_DATABASE_URL')
+    if not dsn:
+        print('BENCH_DATABASE_URL must point at a disposable Postgres database', file=sys.stderr)
+        return 2
+
+    os.environ['DATABASE_URL'] = dsn
+    os.environ.setdefault('DB_POOL_MAX', str(args.concurrency))
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('SLOW_QUERY_MS', '1000')
+    if not args.with_cache:
+        os.environ['CACHE_TTL_SECONDS'] = '0'
+
+    handlers = {name: load_function(name) for name in ('api', 'players', 'teams-reorder')}
+    reset_schema(dsn)
+    rng = random.Random(args.seed)
+    ids = seed(dsn, handlers['api'], args.teams, args.seasons, args.matches, args.players, rng)
+
+    results = []
+    for n, scenario in enumerate(SCENARIOS):
+        if args.only and args.only not in scenario.name:
+            continue
+        handler = handlers[scenario.function]['index'].handler
+        results.append(run_scenario(scenario, handler, ids, args.requests, args.concurrency, args.seed + n))
+
+    print(f'{3 * args.teams} teams, {args.seasons * args.matches} matches, {len(ids["players"])} players, '
+          f'{args.requests} requests per scenario at concurrency {args.concurrency}')
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    thresholds = {}
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds, encoding='utf-8') as f:
+            thresholds = json.load(f)
+    failures = check_thresholds(results, thresholds)
+    for failure in failures:
+        print('THRESHOLD', failure, file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+'''
+Business: Проверка read-your-writes на двух локальных Postgres - основная база и потоковая реплика
+Args: BENCH_DATABASE_URL (основная, схема пересоздается), BENCH_DATABASE_READ_URL (реплика, pg_basebackup -R от основной)
+Returns: код 0, если без токена чтение идет на реплику, а с токеном X-Read-After видит запись, пока реплика отстает
+'''
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from loadtest import load_function, reset_schema
+
+def _call(handler, method: str, path: str, body: Optional[Dict[str, Any]] = None,
+          headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    event = {
+        'httpMethod': method,
+        'queryStringParameters': {'path': path},
+        'headers': headers or {},
+        'body': json.dumps(body) if body is not None else None
+    }
+    return handler(event, None)
+
+def _set_replay(replica, paused: bool) -> None:
+    with replica.cursor() as cur:
+        cur.execute('SELECT pg_wal_replay_pause()' if paused else 'SELECT pg_wal_replay_resume()')
+
+def _wait_for_replica(replica, primary_dsn: str, timeout: float = 10.0) -> None:
+    import psycopg2
+
+    primary = psycopg2.connect(primary_dsn)
+    with primary.cursor() as cur:
+        cur.execute('SELECT pg_current_wal_lsn()::text')
+        lsn = cur.fetchone()[0]
+    primary.close()
+    deadline = time.monotonic() + timeout
+    with replica.cursor() as cur:
+        while time.monotonic() < deadline:
+            cur.execute('SELECT pg_last_wal_replay_lsn() >= %s::pg_lsn', (lsn,))
+            if cur.fetchone()[0]:
+                return
+            time.sleep(0.05)
+    raise RuntimeError('replica did not catch up')
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import psycopg2
+
+    dsn = os.environ.get('BENCH_DATABASE_URL')
+    read_dsn = os.environ.get('BENCH_DATABASE_READ_URL')
+    if not dsn or not read_dsn:
+        print('BENCH_DATABASE_URL and BENCH_DATABASE_READ_URL must point at a disposable primary and its standby', file=sys.stderr)
+        return 2
+
+    os.environ['DATABASE_URL'] = dsn
+    os.environ['DATABASE_READ_URL'] = read_dsn
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ['CACHE_TTL_SECONDS'] = '0'
+
+    replica = psycopg2.connect(read_dsn)
+    replica.autocommit = True
+    with replica.cursor() as cur:
+        cur.execute('SELECT pg_is_in_recovery()')
+        if not cur.fetchone()[0]:
+            print('BENCH_DATABASE_READ_URL is not a standby', file=sys.stderr)
+            return 2
+
+    handler = load_function('api')['index'].handler
+    reset_schema(dsn)
+    _wait_for_replica(replica, dsn)
+
+    failures = []
+    content = f'read-after {time.time()}'
+    _set_replay(replica, True)
+    try:
+        written = _call(handler, 'POST', 'regulations', {'content': content})
+        token = written['headers'].get('X-Read-After')
+        if not token:
+            failures.append('write response has no X-Read-After token')
+
+        stale = json.loads(_call(handler, 'GET', 'regulations')['body']).get('content')
+        if stale == content:
+            failures.append('read without a token did not go to the lagging replica')
+
+        fresh = json.loads(_call(handler, 'GET', 'regulations', headers={'X-Read-After': token or ''})['body']).get('content')
+        if fresh != content:
+            failures.append(f'read with the token returned {fresh!r}, expected the write')
+    finally:
+        _set_replay(replica, False)
+
+    _wait_for_replica(replica, dsn)
+    caught_up = json.loads(_call(handler, 'GET', 'regulations')['body']).get('content')
+    if caught_up != content:
+        failures.append('replica did not serve the write after catching up')
+
+    for failure in failures:
+        print('FAIL', failure, file=sys.stderr)
+    print('read-after: ' + ('ok' if not failures else f'{len(failures)} failure(s)'))
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
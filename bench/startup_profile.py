@@ -0,0 +1,103 @@
+'''
+Business: Профиль импорта функций backend/ - python -X importtime в новом процессе, как при холодном старте
+Args: --function (по умолчанию все три), --runs (медиана по запускам), --top N, --json
+Returns: время импорта index без байткода функции и с ним, что тянет каждый прямой импорт index
+         и самые дорогие модули по собственному времени
+'''
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND = os.path.join(ROOT, 'backend')
+FUNCTIONS = ('api', 'players', 'teams-reorder')
+
+Sample = Dict[str, Tuple[int, int, float, float]]
+
+def import_times(directory: str) -> Sample:
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('DB_WARMUP', 'PYTHONPATH', 'PYTHONDONTWRITEBYTECODE', 'PYTHONPYCACHEPREFIX')}
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import index'], cwd=directory, env=env,
+                               capture_output=True, text=True, check=True)
+    sample: Sample = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        sample[name.strip()] = (len(sample), depth, int(self_us) / 1000, int(cumulative_us) / 1000)
+    return sample
+
+def profile(function: str, runs: int, top: int) -> Dict[str, Any]:
+    directory = os.path.join(BACKEND, function)
+    local = {os.path.splitext(name)[0] for name in os.listdir(directory) if name.endswith('.py')}
+    # Копия без __pycache__: первый импорт компилирует модули функции, следующие берут байткод
+    with tempfile.TemporaryDirectory() as scratch:
+        copy = os.path.join(scratch, function)
+        shutil.copytree(directory, copy, ignore=shutil.ignore_patterns('__pycache__'))
+        compiled = import_times(copy)
+        samples = [import_times(copy) for _ in range(runs)]
+
+    # Модуль импортируется один раз за процесс, поэтому имя - ключ; берем медиану по запускам
+    rows = []
+    for name, (order, depth, _, _) in samples[0].items():
+        values = [sample[name] for sample in samples if name in sample]
+        rows.append({
+            'module': name,
+            'order': order,
+            'depth': depth,
+            'local': name in local,
+            'self_ms': round(statistics.median(value[2] for value in values), 2),
+            'cumulative_ms': round(statistics.median(value[3] for value in values), 2)
+        })
+    # importtime печатает модуль после всех его импортов: дети index - строки глубины 1 между ним и предыдущим корнем
+    index = next(row for row in rows if row['module'] == 'index')
+    start = max((row['order'] for row in rows if row['depth'] == 0 and row['order'] < index['order']), default=-1)
+    direct = [row for row in rows if start < row['order'] < index['order'] and row['depth'] == 1]
+    return {
+        'function': function,
+        'runs': runs,
+        'total_ms': index['cumulative_ms'],
+        'without_bytecode_ms': compiled['index'][3],
+        'direct': sorted(direct, key=lambda row: row['cumulative_ms'], reverse=True)[:top],
+        'heaviest': sorted((row for row in rows if row['module'] != 'index'),
+                           key=lambda row: row['self_ms'], reverse=True)[:top]
+    }
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"== {report['function']}: import index {report['total_ms']:.1f} ms (median of {report['runs']}), "
+          f"{report['without_bytecode_ms']:.1f} ms without __pycache__")
+    print('   imported by index            cumulative ms    self ms')
+    for row in report['direct']:
+        name = row['module'] + (' *' if row['local'] else '')
+        print(f"   {name:<28} {row['cumulative_ms']:>13.2f} {row['self_ms']:>10.2f}")
+    print('   heaviest modules (self time)')
+    for row in report['heaviest']:
+        name = row['module'] + (' *' if row['local'] else '')
+        print(f"   {name:<28} {row['cumulative_ms']:>13.2f} {row['self_ms']:>10.2f}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Profile module import time of the backend functions')
+    parser.add_argument('--function', choices=FUNCTIONS, action='append', help='profile only this function (repeatable)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=12)
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args(argv)
+
+    reports = [profile(function, args.runs, args.top) for function in args.function or FUNCTIONS]
+    for report in reports:
+        print_report(report)
+    print('* - модуль самой функции')
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
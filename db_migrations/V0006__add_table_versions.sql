@@ -0,0 +1,37 @@
+-- Счетчики изменений таблиц для ETag / Last-Modified
+CREATE TABLE table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO table_versions (table_name) VALUES
+    ('league_info'), ('social_links'), ('teams'), ('matches'),
+    ('regulations'), ('champions'), ('players'), ('player_stats');
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO table_versions (table_name, version, updated_at)
+    VALUES (TG_TABLE_NAME, 1, CURRENT_TIMESTAMP)
+    ON CONFLICT (table_name) DO UPDATE
+        SET version = table_versions.version + 1, updated_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_league_info_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON league_info
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_social_links_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON social_links
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_teams_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON teams
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_matches_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON matches
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_regulations_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON regulations
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_champions_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON champions
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_players_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON players
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_player_stats_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON player_stats
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
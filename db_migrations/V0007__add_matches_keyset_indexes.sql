@@ -0,0 +1,8 @@
+-- Составные индексы под keyset-пагинацию календаря по (match_date, id)
+CREATE INDEX idx_matches_date_id ON matches (match_date DESC, id DESC);
+CREATE INDEX idx_matches_home_team_date ON matches (home_team_id, match_date DESC, id DESC);
+CREATE INDEX idx_matches_away_team_date ON matches (away_team_id, match_date DESC, id DESC);
+CREATE INDEX idx_matches_status_date ON matches (status, match_date DESC, id DESC);
+
+-- Старый одноколоночный индекс покрывается idx_matches_date_id
+DROP INDEX IF EXISTS idx_matches_date;
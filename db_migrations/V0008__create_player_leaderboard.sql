@@ -0,0 +1,30 @@
+-- Материализованная таблица бомбардиров: строка на игрока в дивизионе и итоговая строка 'ALL'
+CREATE TABLE player_leaderboard (
+    player_id INTEGER NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+    division VARCHAR(10) NOT NULL,
+    goals INTEGER NOT NULL DEFAULT 0,
+    assists INTEGER NOT NULL DEFAULT 0,
+    games_played INTEGER NOT NULL DEFAULT 0,
+    points INTEGER GENERATED ALWAYS AS (goals + assists) STORED,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (division, player_id)
+);
+
+INSERT INTO player_leaderboard (player_id, division, goals, assists, games_played)
+SELECT player_id, division, COALESCE(goals, 0), COALESCE(assists, 0), COALESCE(games_played, 0)
+FROM player_stats;
+
+INSERT INTO player_leaderboard (player_id, division, goals, assists, games_played)
+SELECT p.id, 'ALL', COALESCE(SUM(ps.goals), 0), COALESCE(SUM(ps.assists), 0), COALESCE(SUM(ps.games_played), 0)
+FROM players p
+LEFT JOIN player_stats ps ON ps.player_id = p.id
+GROUP BY p.id;
+
+-- Индексы под top-N для каждой сортировки
+CREATE INDEX idx_leaderboard_goals ON player_leaderboard (division, goals DESC, assists DESC, player_id);
+CREATE INDEX idx_leaderboard_assists ON player_leaderboard (division, assists DESC, goals DESC, player_id);
+CREATE INDEX idx_leaderboard_points ON player_leaderboard (division, points DESC, goals DESC, player_id);
+
+INSERT INTO table_versions (table_name) VALUES ('player_leaderboard');
+CREATE TRIGGER trg_player_leaderboard_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON player_leaderboard
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
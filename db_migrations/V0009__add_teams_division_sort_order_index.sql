@@ -0,0 +1,12 @@
+-- Порядок команд внутри дивизиона без пропусков и дублей: 0..n-1
+UPDATE teams t SET sort_order = r.position
+FROM (
+    SELECT id, ROW_NUMBER() OVER (PARTITION BY division ORDER BY sort_order, id) - 1 AS position
+    FROM teams
+) r
+WHERE t.id = r.id AND t.sort_order IS DISTINCT FROM r.position;
+
+ALTER TABLE teams ALTER COLUMN sort_order SET NOT NULL;
+
+-- Индекс под блокировку и чтение дивизиона в порядке sort_order
+CREATE INDEX idx_teams_division_sort_order ON teams (division, sort_order);
@@ -0,0 +1,45 @@
+-- Лента изменений счета и статуса матчей для live-подписчиков (long-poll с since=version)
+CREATE TABLE match_events (
+    version BIGSERIAL PRIMARY KEY,
+    match_id INT NOT NULL REFERENCES matches(id) ON DELETE CASCADE,
+    home_score INT,
+    away_score INT,
+    status VARCHAR(50),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_match_events_match ON match_events (match_id, version DESC);
+
+-- Событие пишется в той же транзакции, что и матч; NOTIFY уходит подписчикам при коммите.
+-- Advisory lock держится до коммита, поэтому версии фиксируются строго по порядку
+-- и клиент с since=N не пропустит событие с меньшей версией, закоммиченное позже.
+CREATE OR REPLACE FUNCTION publish_match_event() RETURNS trigger AS $$
+DECLARE
+    event match_events;
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.home_score IS NOT DISTINCT FROM OLD.home_score
+       AND NEW.away_score IS NOT DISTINCT FROM OLD.away_score
+       AND NEW.status IS NOT DISTINCT FROM OLD.status THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('match_events'));
+    INSERT INTO match_events (match_id, home_score, away_score, status)
+    VALUES (NEW.id, NEW.home_score, NEW.away_score, NEW.status)
+    RETURNING * INTO event;
+
+    PERFORM pg_notify('match_events', json_build_object(
+        'version', event.version,
+        'match_id', event.match_id,
+        'home_score', event.home_score,
+        'away_score', event.away_score,
+        'status', event.status,
+        'created_at', event.created_at
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_matches_publish_event AFTER INSERT OR UPDATE OF home_score, away_score, status ON matches
+    FOR EACH ROW EXECUTE FUNCTION publish_match_event();
@@ -0,0 +1,118 @@
+-- Аналитика команды: форма за 5 матчей, текущая серия, дом/выезд, личные встречи.
+-- Пересчитывается только для команд завершенного/измененного матча через refresh_team_analytics(ids)
+CREATE TABLE team_analytics (
+    team_id INT PRIMARY KEY REFERENCES teams(id) ON DELETE CASCADE,
+    form VARCHAR(5) NOT NULL DEFAULT '',
+    streak_type CHAR(1),
+    streak_length INT NOT NULL DEFAULT 0,
+    home_games INT NOT NULL DEFAULT 0,
+    home_wins INT NOT NULL DEFAULT 0,
+    home_losses INT NOT NULL DEFAULT 0,
+    home_goals_for INT NOT NULL DEFAULT 0,
+    home_goals_against INT NOT NULL DEFAULT 0,
+    away_games INT NOT NULL DEFAULT 0,
+    away_wins INT NOT NULL DEFAULT 0,
+    away_losses INT NOT NULL DEFAULT 0,
+    away_goals_for INT NOT NULL DEFAULT 0,
+    away_goals_against INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE team_head_to_head (
+    team_id INT NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+    opponent_id INT NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+    games INT NOT NULL DEFAULT 0,
+    wins INT NOT NULL DEFAULT 0,
+    losses INT NOT NULL DEFAULT 0,
+    goals_for INT NOT NULL DEFAULT 0,
+    goals_against INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (team_id, opponent_id)
+);
+
+-- Коды формы: W/L - победа/поражение в основное время, w/l - в овертайме или по буллитам, D - ничья;
+-- kind - исход W/L/D независимо от овертайма, recency - 1 для последнего завершенного матча команды
+CREATE OR REPLACE FUNCTION team_match_results(team_ids INT[])
+RETURNS TABLE (team_id INT, opponent_id INT, home BOOLEAN, goals_for INT, goals_against INT, code TEXT, kind TEXT, recency BIGINT) AS $$
+    SELECT r.team_id, r.opponent_id, r.home, r.goals_for, r.goals_against, r.code, upper(r.code),
+           ROW_NUMBER() OVER (PARTITION BY r.team_id ORDER BY r.match_date DESC, r.id DESC)
+    FROM (
+        SELECT m.id, m.match_date, x.team_id, x.opponent_id, x.home, x.goals_for, x.goals_against,
+               CASE
+                   WHEN x.goals_for > x.goals_against THEN CASE WHEN m.status = 'Конец матча' THEN 'W' ELSE 'w' END
+                   WHEN x.goals_for < x.goals_against THEN CASE WHEN m.status = 'Конец матча' THEN 'L' ELSE 'l' END
+                   ELSE 'D'
+               END AS code
+        FROM matches m
+        CROSS JOIN LATERAL (VALUES
+            (m.home_team_id, m.away_team_id, TRUE, COALESCE(m.home_score, 0), COALESCE(m.away_score, 0)),
+            (m.away_team_id, m.home_team_id, FALSE, COALESCE(m.away_score, 0), COALESCE(m.home_score, 0))
+        ) AS x(team_id, opponent_id, home, goals_for, goals_against)
+        WHERE m.status IN ('Конец матча', 'Конец матча (ОТ)', 'Конец матча (Б)')
+          AND (m.home_team_id = ANY(team_ids) OR m.away_team_id = ANY(team_ids))
+    ) r
+    WHERE r.team_id = ANY(team_ids)
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION refresh_team_analytics(team_ids INT[]) RETURNS void AS $$
+BEGIN
+    INSERT INTO team_analytics (
+        team_id, form, streak_type, streak_length,
+        home_games, home_wins, home_losses, home_goals_for, home_goals_against,
+        away_games, away_wins, away_losses, away_goals_for, away_goals_against, updated_at
+    )
+    SELECT t.id,
+           COALESCE(s.form, ''), f.kind, COALESCE(s.streak_length, 0),
+           COALESCE(s.home_games, 0), COALESCE(s.home_wins, 0), COALESCE(s.home_losses, 0),
+           COALESCE(s.home_goals_for, 0), COALESCE(s.home_goals_against, 0),
+           COALESCE(s.away_games, 0), COALESCE(s.away_wins, 0), COALESCE(s.away_losses, 0),
+           COALESCE(s.away_goals_for, 0), COALESCE(s.away_goals_against, 0),
+           CURRENT_TIMESTAMP
+    FROM teams t
+    LEFT JOIN team_match_results(team_ids) f ON f.team_id = t.id AND f.recency = 1
+    LEFT JOIN (
+        SELECT r.team_id,
+               string_agg(r.code, '' ORDER BY r.recency) FILTER (WHERE r.recency <= 5) AS form,
+               COALESCE(MIN(r.recency) FILTER (WHERE r.kind <> first.kind), COUNT(*) + 1) - 1 AS streak_length,
+               COUNT(*) FILTER (WHERE r.home) AS home_games,
+               COUNT(*) FILTER (WHERE r.home AND r.kind = 'W') AS home_wins,
+               COUNT(*) FILTER (WHERE r.home AND r.kind = 'L') AS home_losses,
+               COALESCE(SUM(r.goals_for) FILTER (WHERE r.home), 0) AS home_goals_for,
+               COALESCE(SUM(r.goals_against) FILTER (WHERE r.home), 0) AS home_goals_against,
+               COUNT(*) FILTER (WHERE NOT r.home) AS away_games,
+               COUNT(*) FILTER (WHERE NOT r.home AND r.kind = 'W') AS away_wins,
+               COUNT(*) FILTER (WHERE NOT r.home AND r.kind = 'L') AS away_losses,
+               COALESCE(SUM(r.goals_for) FILTER (WHERE NOT r.home), 0) AS away_goals_for,
+               COALESCE(SUM(r.goals_against) FILTER (WHERE NOT r.home), 0) AS away_goals_against
+        FROM team_match_results(team_ids) r
+        JOIN team_match_results(team_ids) first ON first.team_id = r.team_id AND first.recency = 1
+        GROUP BY r.team_id
+    ) s ON s.team_id = t.id
+    WHERE t.id = ANY(team_ids)
+    ON CONFLICT (team_id) DO UPDATE SET
+        form = EXCLUDED.form, streak_type = EXCLUDED.streak_type, streak_length = EXCLUDED.streak_length,
+        home_games = EXCLUDED.home_games, home_wins = EXCLUDED.home_wins, home_losses = EXCLUDED.home_losses,
+        home_goals_for = EXCLUDED.home_goals_for, home_goals_against = EXCLUDED.home_goals_against,
+        away_games = EXCLUDED.away_games, away_wins = EXCLUDED.away_wins, away_losses = EXCLUDED.away_losses,
+        away_goals_for = EXCLUDED.away_goals_for, away_goals_against = EXCLUDED.away_goals_against,
+        updated_at = EXCLUDED.updated_at;
+
+    DELETE FROM team_head_to_head WHERE team_id = ANY(team_ids);
+    INSERT INTO team_head_to_head (team_id, opponent_id, games, wins, losses, goals_for, goals_against)
+    SELECT team_id, opponent_id, COUNT(*),
+           COUNT(*) FILTER (WHERE kind = 'W'), COUNT(*) FILTER (WHERE kind = 'L'),
+           SUM(goals_for), SUM(goals_against)
+    FROM team_match_results(team_ids)
+    WHERE opponent_id IS NOT NULL
+    GROUP BY team_id, opponent_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_team_analytics_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON team_analytics
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_team_head_to_head_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON team_head_to_head
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+INSERT INTO table_versions (table_name) VALUES ('team_analytics'), ('team_head_to_head')
+ON CONFLICT (table_name) DO NOTHING;
+
+SELECT refresh_team_analytics(ARRAY(SELECT id FROM teams));
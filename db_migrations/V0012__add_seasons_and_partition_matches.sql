@@ -0,0 +1,185 @@
+-- Сезоны: матчи секционированы по season_id, турнирная таблица teams и статистика игроков - текущий сезон,
+-- завершенные сезоны замораживаются в season_standings / season_player_stats
+CREATE TABLE seasons (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(20) NOT NULL UNIQUE,
+    starts_on DATE,
+    is_current BOOLEAN NOT NULL DEFAULT FALSE,
+    archived_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Текущим может быть только один сезон
+CREATE UNIQUE INDEX idx_seasons_current ON seasons (is_current) WHERE is_current;
+
+ALTER TABLE matches RENAME TO matches_unpartitioned;
+ALTER TABLE matches_unpartitioned RENAME CONSTRAINT matches_pkey TO matches_unpartitioned_pkey;
+ALTER TABLE match_events DROP CONSTRAINT match_events_match_id_fkey;
+DROP TRIGGER trg_matches_version ON matches_unpartitioned;
+DROP TRIGGER trg_matches_publish_event ON matches_unpartitioned;
+
+-- Первичный ключ секционированной таблицы обязан включать ключ секционирования;
+-- id по-прежнему выдается одной последовательностью и уникален между сезонами
+CREATE TABLE matches (
+    id INT NOT NULL DEFAULT nextval('matches_id_seq'),
+    season_id INT NOT NULL REFERENCES seasons(id),
+    match_date TIMESTAMP NOT NULL,
+    home_team_id INT REFERENCES teams(id),
+    away_team_id INT REFERENCES teams(id),
+    home_score INT DEFAULT 0,
+    away_score INT DEFAULT 0,
+    status VARCHAR(50) NOT NULL DEFAULT 'Не начался' CHECK (status IN ('Не начался', 'Матч идет', 'Конец матча', 'Конец матча (ОТ)', 'Конец матча (Б)', 'Техническое поражение')),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (season_id, id)
+) PARTITION BY LIST (season_id);
+
+ALTER SEQUENCE matches_id_seq OWNED BY matches.id;
+
+-- Секция матчей создается вместе с сезоном
+CREATE OR REPLACE FUNCTION create_season_partition() RETURNS trigger AS $$
+BEGIN
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF matches FOR VALUES IN (%s)', 'matches_s' || NEW.id, NEW.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_seasons_partition AFTER INSERT ON seasons
+    FOR EACH ROW EXECUTE FUNCTION create_season_partition();
+
+-- Все существующие матчи попадают в один текущий сезон, чтобы турнирная таблица не изменилась;
+-- название как в champions.season, сезон начинается в сентябре
+INSERT INTO seasons (name, is_current)
+SELECT CASE WHEN EXTRACT(MONTH FROM d) >= 9
+            THEN to_char(d, 'YYYY') || '/' || to_char(d + INTERVAL '1 year', 'YYYY')
+            ELSE to_char(d - INTERVAL '1 year', 'YYYY') || '/' || to_char(d, 'YYYY')
+       END, TRUE
+FROM (SELECT COALESCE(MAX(match_date), CURRENT_DATE) AS d FROM matches_unpartitioned) latest;
+
+INSERT INTO matches (id, season_id, match_date, home_team_id, away_team_id, home_score, away_score, status, created_at)
+SELECT m.id, s.id, m.match_date, m.home_team_id, m.away_team_id, m.home_score, m.away_score, m.status, m.created_at
+FROM matches_unpartitioned m
+CROSS JOIN seasons s;
+
+DROP TABLE matches_unpartitioned;
+
+-- Индексы V0007 на секционированной таблице; обновление и удаление по id идут через idx_matches_id
+CREATE INDEX idx_matches_id ON matches (id);
+CREATE INDEX idx_matches_date_id ON matches (match_date DESC, id DESC);
+CREATE INDEX idx_matches_home_team_date ON matches (home_team_id, match_date DESC, id DESC);
+CREATE INDEX idx_matches_away_team_date ON matches (away_team_id, match_date DESC, id DESC);
+CREATE INDEX idx_matches_status_date ON matches (status, match_date DESC, id DESC);
+CREATE INDEX idx_matches_status ON matches (status);
+
+CREATE TRIGGER trg_matches_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON matches
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_matches_publish_event AFTER INSERT OR UPDATE OF home_score, away_score, status ON matches
+    FOR EACH ROW EXECUTE FUNCTION publish_match_event();
+
+-- События ссылаются на матч составным ключом; перенос матча в другой сезон обновляет и события
+ALTER TABLE match_events ADD COLUMN season_id INT;
+UPDATE match_events e SET season_id = m.season_id FROM matches m WHERE m.id = e.match_id;
+DELETE FROM match_events WHERE season_id IS NULL;
+ALTER TABLE match_events ALTER COLUMN season_id SET NOT NULL;
+ALTER TABLE match_events ADD CONSTRAINT match_events_match_fkey
+    FOREIGN KEY (season_id, match_id) REFERENCES matches (season_id, id) ON DELETE CASCADE ON UPDATE CASCADE;
+
+CREATE OR REPLACE FUNCTION publish_match_event() RETURNS trigger AS $$
+DECLARE
+    event match_events;
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.home_score IS NOT DISTINCT FROM OLD.home_score
+       AND NEW.away_score IS NOT DISTINCT FROM OLD.away_score
+       AND NEW.status IS NOT DISTINCT FROM OLD.status THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('match_events'));
+    INSERT INTO match_events (match_id, season_id, home_score, away_score, status)
+    VALUES (NEW.id, NEW.season_id, NEW.home_score, NEW.away_score, NEW.status)
+    RETURNING * INTO event;
+
+    PERFORM pg_notify('match_events', json_build_object(
+        'version', event.version,
+        'match_id', event.match_id,
+        'home_score', event.home_score,
+        'away_score', event.away_score,
+        'status', event.status,
+        'created_at', event.created_at
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Аналитика команд (V0011) считается по текущему сезону
+CREATE OR REPLACE FUNCTION team_match_results(team_ids INT[])
+RETURNS TABLE (team_id INT, opponent_id INT, home BOOLEAN, goals_for INT, goals_against INT, code TEXT, kind TEXT, recency BIGINT) AS $$
+    SELECT r.team_id, r.opponent_id, r.home, r.goals_for, r.goals_against, r.code, upper(r.code),
+           ROW_NUMBER() OVER (PARTITION BY r.team_id ORDER BY r.match_date DESC, r.id DESC)
+    FROM (
+        SELECT m.id, m.match_date, x.team_id, x.opponent_id, x.home, x.goals_for, x.goals_against,
+               CASE
+                   WHEN x.goals_for > x.goals_against THEN CASE WHEN m.status = 'Конец матча' THEN 'W' ELSE 'w' END
+                   WHEN x.goals_for < x.goals_against THEN CASE WHEN m.status = 'Конец матча' THEN 'L' ELSE 'l' END
+                   ELSE 'D'
+               END AS code
+        FROM matches m
+        CROSS JOIN LATERAL (VALUES
+            (m.home_team_id, m.away_team_id, TRUE, COALESCE(m.home_score, 0), COALESCE(m.away_score, 0)),
+            (m.away_team_id, m.home_team_id, FALSE, COALESCE(m.away_score, 0), COALESCE(m.home_score, 0))
+        ) AS x(team_id, opponent_id, home, goals_for, goals_against)
+        WHERE m.season_id = (SELECT id FROM seasons WHERE is_current)
+          AND m.status IN ('Конец матча', 'Конец матча (ОТ)', 'Конец матча (Б)')
+          AND (m.home_team_id = ANY(team_ids) OR m.away_team_id = ANY(team_ids))
+    ) r
+    WHERE r.team_id = ANY(team_ids)
+$$ LANGUAGE sql STABLE;
+
+-- Итоговая таблица сезона на момент архивации; название команды копируется, команду могут удалить
+CREATE TABLE season_standings (
+    season_id INT NOT NULL REFERENCES seasons(id),
+    team_id INT NOT NULL,
+    team_name VARCHAR(100) NOT NULL,
+    division VARCHAR(10) NOT NULL,
+    position INT NOT NULL,
+    games_played INT NOT NULL DEFAULT 0,
+    wins INT NOT NULL DEFAULT 0,
+    wins_ot INT NOT NULL DEFAULT 0,
+    losses_ot INT NOT NULL DEFAULT 0,
+    losses INT NOT NULL DEFAULT 0,
+    goals_for INT NOT NULL DEFAULT 0,
+    goals_against INT NOT NULL DEFAULT 0,
+    points INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (season_id, team_id)
+);
+
+CREATE INDEX idx_season_standings_division ON season_standings (season_id, division, position);
+
+-- Итоговая статистика игроков сезона в формате player_leaderboard (строки по дивизионам и 'ALL')
+CREATE TABLE season_player_stats (
+    season_id INT NOT NULL REFERENCES seasons(id),
+    player_id INT NOT NULL,
+    division VARCHAR(10) NOT NULL,
+    nickname VARCHAR(100) NOT NULL,
+    jersey_number INT,
+    position VARCHAR(50),
+    team_id INT,
+    team_name VARCHAR(100),
+    goals INT NOT NULL DEFAULT 0,
+    assists INT NOT NULL DEFAULT 0,
+    games_played INT NOT NULL DEFAULT 0,
+    points INT GENERATED ALWAYS AS (goals + assists) STORED,
+    PRIMARY KEY (season_id, division, player_id)
+);
+
+CREATE INDEX idx_season_player_stats_goals ON season_player_stats (season_id, division, goals DESC, assists DESC, player_id);
+
+CREATE TRIGGER trg_seasons_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON seasons
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_season_standings_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON season_standings
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_season_player_stats_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON season_player_stats
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+INSERT INTO table_versions (table_name) VALUES ('seasons'), ('season_standings'), ('season_player_stats')
+ON CONFLICT (table_name) DO NOTHING;
@@ -0,0 +1,17 @@
+const READ_AFTER_HEADER = 'X-Read-After';
+const READ_AFTER_KEY = 'read_after';
+
+export async function apiFetch(input: string, init: RequestInit = {}): Promise<Response> {
+  const headers = new Headers(init.headers);
+  const readAfter = sessionStorage.getItem(READ_AFTER_KEY);
+  if (readAfter) {
+    headers.set(READ_AFTER_HEADER, readAfter);
+  }
+
+  const response = await fetch(input, { ...init, headers });
+  const token = response.headers.get(READ_AFTER_HEADER);
+  if (token) {
+    sessionStorage.setItem(READ_AFTER_KEY, token);
+  }
+  return response;
+}
@@ -10,6 +10,7 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@/components/ui/table';
 import Icon from '@/components/ui/icon';
 import { useToast } from '@/hooks/use-toast';
+import { apiFetch } from '@/lib/api';
 
 const API_URL = 'https://functions.poehali.dev/6ba303f7-5999-4705-a914-9eea15983942';
 const ADMIN_PASSWORD = 'dyezphl';
@@ -26,6 +27,7 @@ interface Team {
   goals_for: number;
   goals_against: number;
   points: number;
+  sort_order?: number;
   logo_url?: string;
 }
 
@@ -63,19 +65,27 @@ const AdminPanel = () => {
     const currentIndex = teams.findIndex(t => t.id === teamId);
     if (currentIndex === -1) return;
     
-    const newPosition = direction === 'up' ? currentIndex - 1 : currentIndex + 1;
-    if (newPosition < 0 || newPosition >= teams.length) return;
+    const targetIndex = direction === 'up' ? currentIndex - 1 : currentIndex + 1;
+    if (targetIndex < 0 || targetIndex >= teams.length) return;
+    if (teams[targetIndex].division !== teams[currentIndex].division) return;
+
+    // Список приходит в порядке sort_order, поэтому отправляем весь порядок дивизиона так, как его видит админ
+    const newTeams = [...teams];
+    [newTeams[currentIndex], newTeams[targetIndex]] = [newTeams[targetIndex], newTeams[currentIndex]];
+    const division = teams[currentIndex].division;
+    const teamIds = newTeams.filter(t => t.division === division).map(t => t.id);
 
     try {
-      await fetch('https://functions.poehali.dev/56674b88-28ed-4eb5-8ca0-3f5b5af78520', {
+      const response = await apiFetch('https://functions.poehali.dev/56674b88-28ed-4eb5-8ca0-3f5b5af78520', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ team_id: teamId, new_position: newPosition })
+        body: JSON.stringify({ division, team_ids: teamIds })
       });
-      
-      const newTeams = [...teams];
-      [newTeams[currentIndex], newTeams[newPosition]] = [newTeams[newPosition], newTeams[currentIndex]];
-      setTeams(newTeams);
+      if (!response.ok) throw new Error('Reorder failed');
+      const result = await response.json();
+      const positions = new Map<number, number>(result.team_ids.map((id: number, position: number) => [id, position]));
+
+      setTeams(newTeams.map(t => positions.has(t.id) ? { ...t, sort_order: positions.get(t.id) } : t));
       
       toast({ title: 'Успешно', description: 'Позиция команды изменена' });
     } catch (error) {
@@ -103,11 +113,11 @@ const AdminPanel = () => {
   const fetchData = async () => {
     try {
       const [teamsRes, matchesRes, championsRes, infoRes, regulationsRes] = await Promise.all([
-        fetch(`${API_URL}?path=teams`),
-        fetch(`${API_URL}?path=matches`),
-        fetch(`${API_URL}?path=champions`),
-        fetch(`${API_URL}?path=league-info`),
-        fetch(`${API_URL}?path=regulations`)
+        apiFetch(`${API_URL}?path=teams`),
+        apiFetch(`${API_URL}?path=matches`),
+        apiFetch(`${API_URL}?path=champions`),
+        apiFetch(`${API_URL}?path=league-info`),
+        apiFetch(`${API_URL}?path=regulations`)
       ]);
 
       setTeams(await teamsRes.json());
@@ -123,7 +133,7 @@ const AdminPanel = () => {
 
   const saveLeagueInfo = async () => {
     try {
-      await fetch(`${API_URL}?path=league-info`, {
+      await apiFetch(`${API_URL}?path=league-info`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(leagueInfo)
@@ -136,7 +146,7 @@ const AdminPanel = () => {
 
   const saveRegulations = async () => {
     try {
-      await fetch(`${API_URL}?path=regulations`, {
+      await apiFetch(`${API_URL}?path=regulations`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ content: regulations })
@@ -149,7 +159,7 @@ const AdminPanel = () => {
 
   const addTeam = async (teamData: Partial<Team>) => {
     try {
-      await fetch(`${API_URL}?path=teams`, {
+      await apiFetch(`${API_URL}?path=teams`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(teamData)
@@ -163,7 +173,7 @@ const AdminPanel = () => {
 
   const updateTeam = async (teamData: Team) => {
     try {
-      await fetch(`${API_URL}?path=teams`, {
+      await apiFetch(`${API_URL}?path=teams`, {
         method: 'PUT',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(teamData)
@@ -177,7 +187,7 @@ const AdminPanel = () => {
 
   const deleteTeam = async (id: number) => {
     try {
-      await fetch(`${API_URL}?path=teams&id=${id}`, { method: 'DELETE' });
+      await apiFetch(`${API_URL}?path=teams&id=${id}`, { method: 'DELETE' });
       toast({ title: 'Успешно', description: 'Команда удалена' });
       fetchData();
     } catch (error) {
@@ -187,7 +197,7 @@ const AdminPanel = () => {
 
   const addMatch = async (matchData: Partial<Match>) => {
     try {
-      await fetch(`${API_URL}?path=matches`, {
+      await apiFetch(`${API_URL}?path=matches`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(matchData)
@@ -201,7 +211,7 @@ const AdminPanel = () => {
 
   const updateMatch = async (matchData: Match) => {
     try {
-      await fetch(`${API_URL}?path=matches`, {
+      await apiFetch(`${API_URL}?path=matches`, {
         method: 'PUT',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(matchData)
@@ -215,7 +225,7 @@ const AdminPanel = () => {
 
   const deleteMatch = async (id: number) => {
     try {
-      await fetch(`${API_URL}?path=matches&id=${id}`, { method: 'DELETE' });
+      await apiFetch(`${API_URL}?path=matches&id=${id}`, { method: 'DELETE' });
       toast({ title: 'Успешно', description: 'Матч удален' });
       fetchData();
     } catch (error) {
@@ -367,7 +377,7 @@ const AdminPanel = () => {
                             size="sm" 
                             variant="outline" 
                             onClick={() => moveTeam(team.id, 'up')}
-                            disabled={index === 0}
+                            disabled={index === 0 || teams[index - 1].division !== team.division}
                           >
                             <Icon name="ChevronUp" size={16} />
                           </Button>
@@ -375,7 +385,7 @@ const AdminPanel = () => {
                             size="sm" 
                             variant="outline" 
                             onClick={() => moveTeam(team.id, 'down')}
-                            disabled={index === teams.length - 1}
+                            disabled={index === teams.length - 1 || teams[index + 1].division !== team.division}
                           >
                             <Icon name="ChevronDown" size={16} />
                           </Button>
@@ -443,7 +453,7 @@ const AdminPanel = () => {
               <CardTitle>Чемпионы лиги</CardTitle>
               <ChampionDialog teams={teams} onSave={async (data) => {
                 try {
-                  await fetch(`${API_URL}?path=champions`, {
+                  await apiFetch(`${API_URL}?path=champions`, {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
                     body: JSON.stringify(data)
@@ -465,7 +475,7 @@ const AdminPanel = () => {
                     </div>
                     <Button size="sm" variant="destructive" onClick={async () => {
                       try {
-                        await fetch(`${API_URL}?path=champions&id=${champion.id}`, { method: 'DELETE' });
+                        await apiFetch(`${API_URL}?path=champions&id=${champion.id}`, { method: 'DELETE' });
                         toast({ title: 'Успешно', description: 'Чемпион удален' });
                         fetchData();
                       } catch (error) {
@@ -527,7 +537,7 @@ const SocialLinksManager = ({ socialLinks, onUpdate }: { socialLinks: any[]; onU
       return;
     }
     try {
-      await fetch(`${API_URL}?path=social-links`, {
+      await apiFetch(`${API_URL}?path=social-links`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(newLink)
@@ -544,7 +554,7 @@ const SocialLinksManager = ({ socialLinks, onUpdate }: { socialLinks: any[]; onU
 
   const deleteLink = async (id: number) => {
     try {
-      await fetch(`${API_URL}?path=social-links&id=${id}`, { method: 'DELETE' });
+      await apiFetch(`${API_URL}?path=social-links&id=${id}`, { method: 'DELETE' });
       const updatedLinks = links.filter(l => l.id !== id);
       setLinks(updatedLinks);
       onUpdate(updatedLinks);
@@ -19,6 +19,7 @@ interface Team {
   goals_for: number;
   goals_against: number;
   points: number;
+  sort_order?: number;
   logo_url?: string;
 }
 
@@ -34,6 +35,14 @@ interface Match {
   away_team_logo?: string;
 }
 
+interface MatchEvent {
+  version: number;
+  match_id: number;
+  home_score: number;
+  away_score: number;
+  status: string;
+}
+
 interface LeagueInfo {
   league_name: string;
   description: string;
@@ -54,26 +63,56 @@ const Index = () => {
   const [matches, setMatches] = useState<Match[]>([]);
   const [champions, setChampions] = useState<Champion[]>([]);
   const [regulations, setRegulations] = useState('');
+  const [liveVersion, setLiveVersion] = useState<number | null>(null);
 
   useEffect(() => {
     fetchData();
   }, []);
 
+  const hasLiveMatches = matches.some((match) => match.status === 'Матч идет');
+
+  useEffect(() => {
+    if (liveVersion === null || !hasLiveMatches) return;
+    const controller = new AbortController();
+
+    const poll = async (since: number) => {
+      while (!controller.signal.aborted) {
+        try {
+          const res = await fetch(`${API_URL}?path=live&since=${since}`, { signal: controller.signal });
+          const data: { version: number; events: MatchEvent[]; resync?: boolean } = await res.json();
+          if (data.resync) {
+            // Версия клиента впереди сервера: перечитываем матчи и продолжаем с текущей версии
+            fetchData();
+          } else if (data.events.length > 0) {
+            setMatches((current) => current.map((match) => {
+              const event = [...data.events].reverse().find((e) => e.match_id === match.id);
+              return event
+                ? { ...match, home_score: event.home_score, away_score: event.away_score, status: event.status }
+                : match;
+            }));
+          }
+          since = data.version;
+        } catch (error) {
+          if (controller.signal.aborted) return;
+          await new Promise((resolve) => setTimeout(resolve, 5000));
+        }
+      }
+    };
+
+    poll(liveVersion);
+    return () => controller.abort();
+  }, [liveVersion, hasLiveMatches]);
+
   const fetchData = async () => {
     try {
-      const [infoRes, teamsRes, matchesRes, championsRes, regulationsRes] = await Promise.all([
-        fetch(`${API_URL}?path=league-info`),
-        fetch(`${API_URL}?path=teams`),
-        fetch(`${API_URL}?path=matches`),
-        fetch(`${API_URL}?path=champions`),
-        fetch(`${API_URL}?path=regulations`)
-      ]);
+      const bundleRes = await fetch(`${API_URL}?path=homepage`);
+      const bundle = await bundleRes.json();
 
-      const infoData = await infoRes.json();
-      const teamsData = await teamsRes.json();
-      const matchesData = await matchesRes.json();
-      const championsData = await championsRes.json();
-      const regulationsData = await regulationsRes.json();
+      const infoData = bundle.league_info;
+      const teamsData = bundle.teams;
+      const matchesData = bundle.matches;
+      const championsData = bundle.champions;
+      const regulationsData = bundle.regulations;
 
       setLeagueInfo(infoData);
       setTeams(teamsData);
@@ -105,6 +144,7 @@ const Index = () => {
       setMatches(matchesWithLogos);
       setChampions(championsWithLogos);
       setRegulations(regulationsData.content || 'Регламент скоро появится');
+      setLiveVersion(bundle.live_version ?? 0);
     } catch (error) {
       console.error('Error fetching data:', error);
     }
@@ -125,7 +165,10 @@ const Index = () => {
   const getDivisionTeams = (division: string) => {
     return teams.filter(t => t.division === division).sort((a, b) => {
       if (b.points !== a.points) return b.points - a.points;
-      return (b.goals_for - b.goals_against) - (a.goals_for - a.goals_against);
+      const goalDiff = (b.goals_for - b.goals_against) - (a.goals_for - a.goals_against);
+      if (goalDiff !== 0) return goalDiff;
+      // При равенстве очков и разницы шайб действует ручной порядок из админки
+      return (a.sort_order ?? 0) - (b.sort_order ?? 0);
     });
   };
 